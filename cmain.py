@@ -22,9 +22,9 @@ parser.add_argument('-s', type=str, help="Run the code on specific RNA using its
 parser.add_argument('--list', type=str, help="Run the code on list of RNA where their sequence references are stored on a specific file")
 parser.add_argument('-l', type=str, help="Run the code on list of RNA where their sequence references are stored on a specific file")
 
-args = parser.parse_args()
-
 def main():
+    args = parser.parse_args()
+
     dir_prep()
 
     if args.seq:
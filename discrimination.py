@@ -0,0 +1,238 @@
+"""
+    This script benchmarks the trained objective function on its ability to rank the near-native folds lowest. It only relies on NumPy (through the scoring script)
+
+    To do so:
+        1. It loads a native structure and a set of decoys (same sequence, one PDB file per decoy) by batches, so the memory does not grow with the number of decoys
+        2. It computes the Gibbs energy of each batch of decoys, the scored pairs being shared by all the decoys
+        3. It computes the C3' RMSD of each batch of decoys to the native one using a batched Kabsch superposition
+        4. It reports the Spearman correlation between the energies and the RMSD, the enrichment of the lowest energy decoys and the native rank
+"""
+import os
+import numpy as np
+
+import scoring
+
+def get_decoys(dir_path):
+    """Returns the list of the decoys PDB files within the given directory
+
+    Parameters:
+    dir_path (str): The directory path where the decoys PDB files are stored
+
+    Returns:
+    list: Returning the sorted decoys names (file names without the .pdb extension)
+    """
+    return sorted(file[:-4] for file in os.listdir(dir_path) if file.endswith(".pdb") and os.path.isfile(os.path.join(dir_path, file)))
+
+def load_decoys(decoys, dir_path, residues, batch_size=1000):
+    """Loads the C3' coordinates of the first model of each decoy, by batches
+
+    Parameters:
+    decoys (list): The decoys names
+    dir_path (str): The directory path where the decoys PDB files are stored
+    residues (list): The residues names of the native structure
+    batch_size (int): The number of decoys per batch, default is 1000
+
+    Returns:
+    generator: Yielding the kept decoys names and their D x N x 3 coordinates of each batch, decoys with other residues than the native ones are skipped
+    """
+    for start in range(0, len(decoys), batch_size):
+        names = []
+        coords = np.empty((min(batch_size, len(decoys) - start), len(residues), 3))
+
+        for decoy in decoys[start:start + batch_size]:
+            try:
+                decoy_coords, decoy_residues, _ = scoring.load_pdb(decoy, dir_path)[0]
+
+            except (OSError, ValueError):
+                print(f"Can not read the {decoy} decoy, it is skipped")
+                continue
+
+            if len(decoy_residues) != len(residues):
+                print(f"The {decoy} decoy has {len(decoy_residues)} C3' atoms instead of {len(residues)}, it is skipped")
+                continue
+
+            if decoy_residues != residues:
+                print(f"The {decoy} decoy sequence is not the native one, it is skipped")
+                continue
+
+            coords[len(names)] = decoy_coords
+            names.append(decoy)
+
+        yield names, coords[:len(names)]
+
+def batch_energies(coords, residues, chains, log_ratio):
+    """Calculates the Gibbs energy of several conformations of the same sequence
+
+    Parameters:
+    coords (np.ndarray): The D x N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+
+    Returns:
+    np.ndarray: Returning the D gibbs energies
+    """
+    codes = scoring.base_codes(residues)
+    chains = np.asarray(chains)
+
+    # The candidate pairs only depend on the sequence, the distance threshold is applied per conformation
+    idx_1, idx_2 = np.triu_indices(len(codes), k=scoring.min_separation)
+    keep = (chains[idx_1] == chains[idx_2]) & (codes[idx_1] >= 0) & (codes[idx_2] >= 0)
+    idx_1, idx_2 = idx_1[keep], idx_2[keep]
+    pair_code = scoring.pair_codes[codes[idx_1], codes[idx_2]]
+
+    energies = np.zeros(len(coords))
+    batch_size = max(1, scoring.max_block // max(1, len(idx_1)))
+
+    for start in range(0, len(coords), batch_size):
+        batch = coords[start:start + batch_size]
+        distance = np.sqrt(((batch[:, idx_1] - batch[:, idx_2])**2).sum(axis=2))
+        dist_bin = np.minimum(distance.astype(np.int64), scoring.num_bins - 1)
+        table = {"code": pair_code, "distance": distance, "bin": dist_bin}
+
+        pair_energy = scoring.pair_energies(table, log_ratio)[0]
+        energies[start:start + batch_size] = np.where(distance <= scoring.max_distance, pair_energy, 0.).sum(axis=1)
+
+    return energies
+
+def batch_rmsd(coords, reference):
+    """Calculates the RMSD of several conformations to a reference one after their optimal superposition (Kabsch)
+
+    Parameters:
+    coords (np.ndarray): The D x N x 3 coordinates
+    reference (np.ndarray): The N x 3 reference coordinates
+
+    Returns:
+    np.ndarray: Returning the D RMSD values
+    """
+    coords = coords - coords.mean(axis=1, keepdims=True)
+    reference = reference - reference.mean(axis=0)
+
+    # The RMSD is obtained from the singular values of the covariance matrices, the rotations are never applied
+    covariance = np.einsum("dni,nj->dij", coords, reference)
+    u, singular, vt = np.linalg.svd(covariance)
+    singular[:, -1] *= np.sign(np.linalg.det(u) * np.linalg.det(vt))
+
+    sq_dev = (coords**2).sum(axis=(1, 2)) + (reference**2).sum() - 2 * singular.sum(axis=1)
+    return np.sqrt(np.maximum(sq_dev, 0.) / len(reference))
+
+def calc_ranks(values):
+    """Returns the ranks of the given values (1 for the lowest), the ties get their average rank
+
+    Parameters:
+    values (np.ndarray): The values to be ranked
+
+    Returns:
+    np.ndarray: Returning the float ranks
+    """
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    last_ranks = np.cumsum(counts)
+
+    return (last_ranks - (counts - 1) / 2)[inverse]
+
+def calc_spearman(values_1, values_2):
+    """Calculates the Spearman correlation of two series
+
+    Parameters:
+    values_1, values_2 (np.ndarray): The two series
+
+    Returns:
+    float: Returning the Spearman correlation (nan if one series is constant)
+    """
+    ranks_1, ranks_2 = calc_ranks(values_1), calc_ranks(values_2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.corrcoef(ranks_1, ranks_2)[0, 1])
+
+def calc_enrichment(energies, rmsd, top=0.1):
+    """Calculates the enrichment of the lowest energy decoys: the fraction of the top energy decoys being also within the top RMSD ones, divided by the expected random fraction
+
+    Parameters:
+    energies (np.ndarray): The decoys energies
+    rmsd (np.ndarray): The decoys RMSD to the native structure
+    top (float): The fraction of decoys considered on both sides, default is 0.1 (10 %)
+
+    Returns:
+    float: Returning the enrichment (1 for a random ranking)
+    """
+    num_top = max(1, int(round(top * len(energies))))
+    top_energies = np.argsort(energies, kind="stable")[:num_top]
+    top_rmsd = np.argsort(rmsd, kind="stable")[:num_top]
+
+    return len(np.intersect1d(top_energies, top_rmsd)) / num_top / (num_top / len(energies))
+
+def discrimination_run(native, decoys_dir, pdb_dir="PDB", rpt_dir="reports", top=0.1, output=None, batch_size=1000):
+    """The discrimination benchmark script, it checks if the trained objective function ranks the near-native decoys lowest
+
+    Parameters:
+    native (str): The reference of the native structure
+    decoys_dir (str): The directory path where the decoys PDB files are stored
+    pdb_dir (str): The directory path where the native PDB file is stored, default is "PDB"
+    rpt_dir (str): The directory path where the log ratio report is saved, default is "reports"
+    top (float): The fraction of decoys used for the enrichment, default is 0.1 (10 %)
+    output (str): The path of a CSV file where the energy and the RMSD of each decoy will be saved, default is None
+    batch_size (int): The number of decoys loaded and scored at once, default is 1000
+
+    Returns:
+    dict: Returning the "spearman" correlation, the "enrichment", the native "rank" and the number of "decoys" (None if nothing could be scored)
+    """
+    try:
+        log_ratio = scoring.read_report("log_ratio", rpt_dir)
+
+    except OSError:
+        print(f"Can not open the {rpt_dir}/log_ratio.txt report, please run the training first")
+        return None
+
+    try:
+        native_coords, residues, chains = scoring.load_pdb(native, pdb_dir)[0]
+
+    except OSError:
+        print(f"Can not open the {native} structure")
+        return None
+
+    try:
+        decoys = get_decoys(decoys_dir)
+
+    except OSError:
+        print(f"Can not open the {decoys_dir} decoys directory")
+        return None
+
+    print(f"Scoring the {len(decoys)} decoys of {native} from {decoys_dir}...")
+    native_energy = batch_energies(native_coords[None], residues, chains, log_ratio)[0]
+
+    names, energies, rmsd = [], [], []
+    for batch_names, coords in load_decoys(decoys, decoys_dir, residues, batch_size):
+        if len(batch_names) == 0:
+            continue
+
+        names += batch_names
+        energies.append(batch_energies(coords, residues, chains, log_ratio))
+        rmsd.append(batch_rmsd(coords, native_coords))
+
+    if len(names) == 0:
+        print(f"No decoy with the {native} residues was found within {decoys_dir}")
+        return None
+
+    energies, rmsd = np.concatenate(energies), np.concatenate(rmsd)
+
+    results = {
+        "decoys": len(names),
+        "spearman": calc_spearman(energies, rmsd),
+        "enrichment": calc_enrichment(energies, rmsd, top),
+        "rank": int((energies < native_energy).sum()) + 1,
+    }
+
+    print(f"The native energy is: {native_energy}, its rank is {results['rank']} out of {len(names) + 1}")
+    print(f"The Spearman correlation between energies and RMSD is: {results['spearman']}")
+    print(f"The enrichment of the {top:.0%} lowest energy decoys is: {results['enrichment']}")
+
+    if output:
+        with open(output, "w") as csv_file:
+            csv_file.write("decoy;energy;rmsd\n")
+            for name, energy, decoy_rmsd in zip(names, energies.tolist(), rmsd.tolist()):
+                csv_file.write(f"{name};{energy};{decoy_rmsd}\n")
+
+    return results
+
+if __name__ == "__main__":
+    print("Welcome to the Discrimination Script...")
@@ -10,6 +10,8 @@ from settings import pdb_lines, pdb_cols, base_pairs, base_list, col_names, inte
 from files_manager import *
 from training import *
 
+import scoring
+
 def linear_interpolation(seq_ref, dir_path="pdb_models", rpt_dir="reports"):
     """Calculate of the Gibbs energy based on the distances and return the calculated value
     
@@ -58,30 +60,27 @@ def linear_interpolation(seq_ref, dir_path="pdb_models", rpt_dir="reports"):
 
                         distance = math.sqrt(((x_a - x_b)**2) + ((y_a - y_b)**2)+ ((z_a - z_b)**2))
 
-                        x_1 = math.floor(distance)
-                        x_2 = math.ceil(distance)
-                        
                         if distance >= 0. and distance <= 20.:
-                            dist_int = int(distance)
-                            col_idx = dist_int
-                            col_name = intervals[col_idx]                    
-                            
-                            y_1 = train_score_df.iloc[row_idx, col_idx]
-                            y_2 = train_score_df.iloc[row_idx, col_idx]
-                           
-                            energy = y_1 + (distance - x_1) * (y_2 - y_1) / (x_2 - x_1)
-                            dist_int = int(distance)
+                            # The log ratio value of an interval is used at its lower bound, the last one is kept constant up to 20 A
+                            col_idx = min(int(distance), len(intervals) - 1)
+                            x_1 = col_idx
+
+                            y_1 = train_score_df.at[row_idx, intervals[col_idx]]
+                            y_2 = train_score_df.at[row_idx, intervals[min(col_idx + 1, len(intervals) - 1)]]
+
+                            energy = y_1 + (distance - x_1) * (y_2 - y_1)
 
                             gibbs_energy += energy
                         
     print(f"The Gibbs energy is: {gibbs_energy}")
     return gibbs_energy
 
-def evaluation_run(seq_ref):
+def evaluation_run(seq_ref, cache_dir=None):
     """The main evaluation script, it computes the scoring value using a linear interpolation
     
     Parameters:
     seq_ref (str): The reference of the sequence to be checked
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
 
     Returns:
     None: Launch the training script to perform the requested computing
@@ -98,13 +97,19 @@ def evaluation_run(seq_ref):
         print("Report files preparation...")
         report_prep()
 
+        # The pairs distances are computed (or read from the cache) once, and shared by the distances and the score calculations
+        models = scoring.load_structure(seq_ref)
+        tables = [scoring.cached_table(coords, residues, chains, cache_dir) if cache_dir else scoring.blocked_table(coords, residues, chains) for coords, residues, chains in models]
+
         print("Distances calculation...")
-        calc_distances(seq_ref)
+        update_distances(sum(scoring.calc_histogram(table) for table in tables))
         final_distance()
 
         print("Score calculation...")
-        linear_interpolation(seq_ref)
-        
+        log_ratio = scoring.read_report("log_ratio")
+        gibbs_energy = sum(scoring.calc_energy(table, log_ratio) for table in tables)
+
+        print(f"The Gibbs energy is: {gibbs_energy}")
     
     else:
         print(f"The {seq_ref} PDB file is not an RNA.")
@@ -0,0 +1,97 @@
+"""
+    This script measures the startup cost of the different entry points, each import is run within a new Python process (as done by a job scheduler)
+
+    To do so:
+        1. It launches a new interpreter importing the given module, several times
+        2. It launches a new interpreter running a whole lightweight scoring (smain score), as paid by each scheduled process
+        3. It reports the best and the median wall times for each module and for the scoring run
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import os
+import time
+
+modules = ["smain", "scoring", "evaluation", "cmain"]
+
+def launch_time(code, repeat=10):
+    """Measures the wall time needed by a new Python process to run the given code, from the repository directory
+
+    Parameters:
+    code (str): The Python code to be run
+    repeat (int): The number of processes to be launched, default is 10
+
+    Returns:
+    list: Returning the wall times in seconds
+    """
+    cmd = [sys.executable, "-c", code]
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        times.append(time.perf_counter() - start)
+
+        # A failing process would otherwise be reported as a fast one
+        if process.returncode != 0:
+            raise RuntimeError(f"The process running '{code}' failed:\n{process.stderr}")
+
+    return times
+
+def import_time(module, repeat=10):
+    """Measures the wall time needed by a new Python process to import the given module
+
+    Parameters:
+    module (str): The module to be imported
+    repeat (int): The number of processes to be launched, default is 10
+
+    Returns:
+    list: Returning the wall times in seconds
+    """
+    return launch_time(f"import {module}", repeat)
+
+def score_time(seq_ref, repeat=10):
+    """Measures the wall time needed by a new Python process to score the given RNA with the lightweight version (smain score)
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be scored
+    repeat (int): The number of processes to be launched, default is 10
+
+    Returns:
+    list: Returning the wall times in seconds
+    """
+    return launch_time(f"import smain; smain.main(['score', '{seq_ref}'])", repeat)
+
+def main():
+    """Launches the import time benchmark for the given modules
+
+    Parameters: None
+
+    Returns: None
+    """
+    parser = argparse.ArgumentParser(description="Import time benchmark of the RNA Folding Energy Estimator entry points")
+    parser.add_argument('modules', type=str, nargs="*", default=modules, help="The modules to be imported")
+    parser.add_argument('-n', '--repeat', type=int, default=10, help="Number of processes launched per module")
+    parser.add_argument('-s', '--seq', type=str, default="4P5J", help="The sequence reference scored by the smain score row, default is 4P5J")
+    args = parser.parse_args()
+
+    baseline = statistics.median(import_time("settings", args.repeat))
+    print(f"{'Module':<12}{'Best [ms]':>12}{'Median [ms]':>14}{'Overhead [ms]':>16}")
+
+    rows = [(module, lambda module=module: import_time(module, args.repeat)) for module in args.modules]
+    rows.append(("smain score", lambda: score_time(args.seq, args.repeat)))
+
+    for name, measure in rows:
+        try:
+            times = measure()
+
+        except RuntimeError as error:
+            print(f"{name:<12}{'failed':>12}")
+            print(error)
+            continue
+
+        print(f"{name:<12}{min(times) * 1000:>12.1f}{statistics.median(times) * 1000:>14.1f}{(statistics.median(times) - baseline) * 1000:>16.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+    This script is an approximate version of the training script, intended for the prototyping of new potentials (e.g. new atoms selections or intervals). It only relies on NumPy (through the scoring script)
+
+    To do so:
+        1. It samples a given budget of pairs per structure, uniformly or stratified by chain and by sequence separation, instead of enumerating all of them
+        2. It estimates the distances counts and their variances from the sampled pairs (small strata are fully enumerated)
+        3. It computes the observed frequency, the reference frequency and the log ratio with their standard errors
+        4. It stops once the log ratio table did not change more than a given tolerance between two checks
+
+    The chains are expected to be stored as contiguous blocks of residues, as within the PDB files, the other structures are skipped
+"""
+import numpy as np
+
+import scoring
+from settings import base_list
+
+num_cells = len(base_list) * scoring.num_bins
+
+def get_strata(chains, mode="stratified"):
+    """Returns the strata of the scored pairs of a model: one per chain (uniform) or one per chain and sequence separation range (stratified)
+
+    The separation ranges are [4, 8), [8, 16), [16, 32)... as most of the pairs closer than 20 A are short range ones
+
+    Parameters:
+    chains (list): The chains identifiers
+    mode (str): The sampling mode, "uniform" or "stratified", default is "stratified"
+
+    Returns:
+    list: Returning the (chain first index, chain length, min separation, max separation, number of pairs) strata
+
+    Raises:
+    ValueError: If a chain is not a contiguous block of residues (its pairs could not be sampled by separation)
+    """
+    chains = np.asarray(chains)
+    strata = []
+
+    for chain in dict.fromkeys(chains.tolist()):
+        positions = np.flatnonzero(chains == chain)
+        start, length = int(positions[0]), len(positions)
+
+        if positions[-1] - start + 1 != length:
+            raise ValueError(f"The chain {chain} is not a contiguous block of residues")
+
+        if length <= scoring.min_separation:
+            continue
+
+        edges = [scoring.min_separation, length]
+        if mode == "stratified":
+            edges = [scoring.min_separation]
+            while edges[-1] * 2 < length:
+                edges.append(edges[-1] * 2)
+            edges.append(length)
+
+        for sep_min, sep_max in zip(edges[:-1], edges[1:]):
+            separations = np.arange(sep_min, sep_max)
+            strata.append((start, length, sep_min, sep_max, int((length - separations).sum())))
+
+    return strata
+
+def sample_stratum(stratum, num_samples, rng):
+    """Samples pairs (with replacement) within a stratum, all its pairs are returned if the stratum is not larger than the samples number
+
+    Parameters:
+    stratum (tuple): The stratum returned by get_strata
+    num_samples (int): The number of pairs to be sampled
+    rng (np.random.Generator): The random numbers generator
+
+    Returns:
+    tuple: Returning the (idx_1, idx_2) arrays and a boolean, True if the stratum was fully enumerated
+    """
+    start, length, sep_min, sep_max, num_pairs = stratum
+    separations = np.arange(sep_min, sep_max)
+    pairs_per_sep = length - separations
+
+    if num_samples >= num_pairs:
+        sep = np.repeat(separations, pairs_per_sep)
+        offsets = np.arange(num_pairs) - np.repeat(np.cumsum(pairs_per_sep) - pairs_per_sep, pairs_per_sep)
+        return start + offsets, start + offsets + sep, True
+
+    # The separation is drawn with a probability proportional to its number of pairs, then the first residue uniformly
+    sep = rng.choice(separations, size=num_samples, p=pairs_per_sep / num_pairs)
+    offsets = (rng.random(num_samples) * (length - sep)).astype(np.int64)
+    return start + offsets, start + offsets + sep, False
+
+def sample_counts(coords, residues, chains, budget=5000, mode="stratified", rng=None):
+    """Estimates the distances counts of a model and their variances from a sample of its pairs
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    budget (int): The number of pairs to be sampled, default is 5000
+    mode (str): The sampling mode, "uniform" (proportional to the chains sizes) or "stratified" (same budget per chain and separation range), default is "stratified"
+    rng (np.random.Generator): The random numbers generator, default is None (new generator)
+
+    Returns:
+    tuple: Returning the 10 x 20 estimated counts and variances arrays, and the number of sampled pairs
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    codes = scoring.base_codes(residues)
+
+    counts = np.zeros(num_cells)
+    variances = np.zeros(num_cells)
+    num_sampled = 0
+
+    strata = get_strata(chains, mode)
+    sizes = np.array([stratum[4] for stratum in strata], dtype=float)
+    if mode == "stratified":
+        allocation = np.full(len(strata), budget / max(1, len(strata)))
+    else:
+        allocation = budget * sizes / max(1., sizes.sum())
+
+    for stratum, num_samples in zip(strata, np.maximum(1, allocation.astype(np.int64))):
+        idx_1, idx_2, exhaustive = sample_stratum(stratum, int(num_samples), rng)
+        num_sampled += len(idx_1)
+
+        distance = np.sqrt(((coords[idx_1] - coords[idx_2])**2).sum(axis=1))
+        pair_code = scoring.pair_codes[codes[idx_1], codes[idx_2]]
+        dist_bin = np.minimum(distance.astype(np.int64), scoring.num_bins - 1)
+
+        # The pairs which are not scored (non standard bases or farther than 20 A) are counted within an extra cell
+        cell = np.where((pair_code >= 0) & (distance <= scoring.max_distance), pair_code.astype(np.int64) * scoring.num_bins + dist_bin, num_cells)
+        hits = np.bincount(cell, minlength=num_cells + 1)[:num_cells]
+
+        if exhaustive:
+            counts += hits
+
+        else:
+            proportion = hits / len(idx_1)
+            counts += stratum[4] * proportion
+            variances += stratum[4]**2 * proportion * (1 - proportion) / len(idx_1)
+
+    shape = (len(base_list), scoring.num_bins)
+    return counts.reshape(shape), variances.reshape(shape), num_sampled
+
+def ratio_variance(counts, variances, axis):
+    """Returns the variance of the frequencies counts / counts total (along the given axis), using the delta method and independent cells
+
+    Parameters:
+    counts (np.ndarray): The 10 x 20 estimated counts
+    variances (np.ndarray): The 10 x 20 counts variances
+    axis (int): The axis of the totals, 1 for the observed frequency and 0 for the reference one
+
+    Returns:
+    np.ndarray: Returning the 10 x 20 frequencies variances
+    """
+    total = counts.sum(axis=axis, keepdims=True)
+    total_var = variances.sum(axis=axis, keepdims=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((total - counts)**2 * variances + counts**2 * (total_var - variances)) / total**4
+
+def calc_standard_errors(counts, variances):
+    """Calculates the frequencies and the log ratio with their standard errors from the estimated counts
+
+    Parameters:
+    counts (np.ndarray): The 10 x 20 estimated counts
+    variances (np.ndarray): The 10 x 20 counts variances
+
+    Returns:
+    dict: Returning the "obs_freq", "ref_freq" and "log_ratio" arrays and their "obs_freq_se", "ref_freq_se" and "log_ratio_se" (nan where the log ratio is undefined)
+    """
+    obs_freq, ref_freq, log_ratio = scoring.calc_frequencies(counts)
+    obs_var = ratio_variance(counts, variances, 1)
+    ref_var = ratio_variance(counts, variances, 0)
+
+    # When the count is defined, obs_freq / ref_freq is the column total over the row total: the count variance cancels out,
+    # only the totals variances and their covariance (the cell variance, the cells being independent) remain
+    row_total, row_var = counts.sum(axis=1, keepdims=True), variances.sum(axis=1, keepdims=True)
+    col_total, col_var = counts.sum(axis=0, keepdims=True), variances.sum(axis=0, keepdims=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_var = row_var / row_total**2 + col_var / col_total**2 - 2 * variances / (row_total * col_total)
+        log_ratio_se = np.sqrt(np.maximum(log_var, 0.)) / np.log(10)
+
+    log_ratio_se[(counts <= 0) | ~np.isfinite(log_ratio_se)] = np.nan
+
+    return {"obs_freq": obs_freq, "obs_freq_se": np.sqrt(obs_var), "ref_freq": ref_freq, "ref_freq_se": np.sqrt(ref_var), "log_ratio": log_ratio, "log_ratio_se": log_ratio_se}
+
+def quick_training_run(seq_refs, budget=5000, mode="stratified", tol=0.01, check_every=10, seed=None, pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports"):
+    """The quick training script, it trains an approximate objective function from a sample of the pairs of each structure
+
+    The structures are processed in a random order, the log ratio table is checked every check_every structures and the training stops once its largest change (over the defined values) is below tol
+
+    Parameters:
+    seq_refs (list): The references of the sequences used for the training
+    budget (int): The number of pairs sampled per model, default is 5000
+    mode (str): The sampling mode, "uniform" or "stratified", default is "stratified"
+    tol (float): The log ratio convergence tolerance, default is 0.01 (None to use all the structures)
+    check_every (int): The number of structures between two convergence checks, default is 10
+    seed (int): The random numbers generator seed, default is None
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where report will be saved, default is "reports"
+
+    Returns:
+    dict: Returning the calc_standard_errors results and the references of the sequences actually used ("seq_refs"), None if no model was sampled (the reports are then left unchanged)
+    """
+    if check_every < 1:
+        raise ValueError(f"The number of structures between two checks must be at least 1, got {check_every}")
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((len(base_list), scoring.num_bins))
+    variances = np.zeros((len(base_list), scoring.num_bins))
+    previous = None
+    num_sampled = 0
+    num_models = 0
+    trained_refs = []
+
+    for idx, seq_ref in enumerate(rng.permutation(seq_refs)):
+        try:
+            models = scoring.load_structure(seq_ref, pdb_dir, mdl_dir)
+
+        except OSError:
+            print(f"Can not open the {seq_ref} structure")
+            continue
+
+        try:
+            samples = [sample_counts(coords, residues, chains, budget, mode, rng) for coords, residues, chains in models]
+
+        except ValueError as error:
+            print(f"Can not sample the {seq_ref} structure: {error}")
+            continue
+
+        for model_counts, model_variances, model_sampled in samples:
+            counts += model_counts
+            variances += model_variances
+            num_sampled += model_sampled
+            num_models += 1
+
+        trained_refs.append(str(seq_ref))
+
+        if tol is not None and (idx + 1) % check_every == 0:
+            log_ratio = scoring.calc_frequencies(counts)[2]
+
+            # The undefined values (set to 10) are not taken into account, a rare interval could switch between defined and undefined
+            if previous is not None and np.abs(log_ratio - previous)[(log_ratio != 10) & (previous != 10)].max(initial=0.) < tol:
+                print(f"The log ratio converged after {idx + 1} structures")
+                break
+
+            previous = log_ratio
+
+    if num_models == 0:
+        print("No structure could be used for the training, the reports are not written")
+        return None
+
+    print(f"Quick training done using {num_sampled} sampled pairs")
+    results = calc_standard_errors(counts, variances)
+    results["seq_refs"] = trained_refs
+
+    scoring.write_report(counts, "distances", rpt_dir)
+    for report in ["obs_freq", "obs_freq_se", "ref_freq", "ref_freq_se", "log_ratio", "log_ratio_se"]:
+        scoring.write_report(results[report], report, rpt_dir)
+
+    return results
+
+if __name__ == "__main__":
+    print("Welcome to the Quick Training Script...")
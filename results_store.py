@@ -0,0 +1,263 @@
+"""
+    This script manages an indexed local results store (SQLite database), so the scores of millions of decoys can be kept and queried without re-scanning report files
+
+    To do so:
+        1. It identifies each potential by the hash of its log ratio table, and each structure by the hash of its content (see scoring.structure_hash)
+        2. It records the trained potentials (training provenance) and the scores of each model, the residues energies being optional
+        3. It writes the scores by batches within transactions
+        4. It skips the structure/potential/reference triplets which are already stored, the scores of a structure already stored under another reference are copied instead of being computed again
+        5. It answers the top-k and the per-target queries using the database indexes
+"""
+import hashlib
+import sqlite3
+import time
+import numpy as np
+
+import scoring
+from settings import pdb_cols, intervals
+
+schema = """
+CREATE TABLE IF NOT EXISTS potentials (
+    potential_hash TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    seq_refs TEXT,
+    log_ratio BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    structure_hash TEXT NOT NULL,
+    potential_hash TEXT NOT NULL,
+    model INTEGER NOT NULL,
+    seq_ref TEXT NOT NULL,
+    energy REAL NOT NULL,
+    residue_energies BLOB,
+    PRIMARY KEY (structure_hash, potential_hash, seq_ref, model)
+);
+CREATE INDEX IF NOT EXISTS scores_potential_energy ON scores (potential_hash, energy);
+CREATE INDEX IF NOT EXISTS scores_seq_ref ON scores (seq_ref, potential_hash);
+"""
+
+def open_store(db_path="results.db"):
+    """Opens (and creates if needed) the results store
+
+    Parameters:
+    db_path (str): The path of the SQLite database file, default is "results.db"
+
+    Returns:
+    sqlite3.Connection: Returning the database connection
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+
+    return conn
+
+def potential_hash(log_ratio):
+    """Returns the hash of a potential, including the atoms selection and the intervals it was trained with
+
+    Parameters:
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+
+    Returns:
+    str: Returning the sha256 hexadecimal digest
+    """
+    sha = hashlib.sha256()
+    sha.update(np.ascontiguousarray(log_ratio, dtype=float).tobytes())
+    sha.update(f"{','.join(pdb_cols)};{','.join(intervals)};{scoring.min_separation}".encode())
+
+    return sha.hexdigest()
+
+def models_hash(models):
+    """Returns the content hash of a structure, combining the hashes of all its models
+
+    Parameters:
+    models (list): The (coords, residues, chains) tuples returned by scoring.load_structure
+
+    Returns:
+    str: Returning the sha256 hexadecimal digest
+    """
+    sha = hashlib.sha256()
+    for coords, residues, chains in models:
+        sha.update(scoring.structure_hash(coords, residues, chains).encode())
+
+    return sha.hexdigest()
+
+def add_potential(conn, log_ratio, seq_refs=None):
+    """Records a trained potential (training provenance), if it is already stored only its missing training references are added
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    seq_refs (list): The references of the sequences used for the training, default is None
+
+    Returns:
+    str: Returning the potential hash
+    """
+    pot_hash = potential_hash(log_ratio)
+
+    with conn:
+        # A potential first recorded by a scoring run has no training references, they are filled in once known
+        conn.execute("INSERT INTO potentials VALUES (?, ?, ?, ?) ON CONFLICT (potential_hash) DO UPDATE SET seq_refs = excluded.seq_refs WHERE potentials.seq_refs IS NULL", (pot_hash, time.time(), None if seq_refs is None else ";".join(seq_refs), np.asarray(log_ratio, dtype=float).tobytes()))
+
+    return pot_hash
+
+def add_scores(conn, rows):
+    """Writes a batch of scores within one transaction
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    rows (list): The (structure_hash, potential_hash, model, seq_ref, energy, residue_energies) tuples, residue_energies being an array or None
+
+    Returns:
+    None: Inserts (or replaces) the scores
+    """
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)", [row[:5] + (None if row[5] is None else np.asarray(row[5], dtype=np.float32).tobytes(),) for row in rows])
+
+def has_scores(conn, structure_hash, pot_hash, seq_ref=None):
+    """Checks if the scores of a structure with a potential are already stored
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    structure_hash (str): The structure content hash
+    pot_hash (str): The potential hash
+    seq_ref (str): The reference the scores are stored under, default is None (any reference)
+
+    Returns:
+    bool: Returning True if at least one model score is stored
+    """
+    if seq_ref is None:
+        return conn.execute("SELECT 1 FROM scores WHERE structure_hash = ? AND potential_hash = ? LIMIT 1", (structure_hash, pot_hash)).fetchone() is not None
+
+    return conn.execute("SELECT 1 FROM scores WHERE structure_hash = ? AND potential_hash = ? AND seq_ref = ? LIMIT 1", (structure_hash, pot_hash, seq_ref)).fetchone() is not None
+
+def copy_scores(conn, structure_hash, pot_hash, seq_ref):
+    """Records the scores of a structure already stored under another reference (same content) under the given reference too
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    structure_hash (str): The structure content hash
+    pot_hash (str): The potential hash
+    seq_ref (str): The new reference
+
+    Returns:
+    int: Returning the number of copied scores
+    """
+    with conn:
+        source = conn.execute("SELECT seq_ref FROM scores WHERE structure_hash = ? AND potential_hash = ? LIMIT 1", (structure_hash, pot_hash)).fetchone()[0]
+        return conn.execute("INSERT OR IGNORE INTO scores SELECT structure_hash, potential_hash, model, ?, energy, residue_energies FROM scores WHERE structure_hash = ? AND potential_hash = ? AND seq_ref = ?", (seq_ref, structure_hash, pot_hash, source)).rowcount
+
+def top_scores(conn, pot_hash, k=10):
+    """Returns the k lowest energy models scored with a potential
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    pot_hash (str): The potential hash
+    k (int): The number of models, default is 10
+
+    Returns:
+    list: Returning the (seq_ref, model, energy, structure_hash) tuples ordered by energy
+    """
+    return conn.execute("SELECT seq_ref, model, energy, structure_hash FROM scores WHERE potential_hash = ? ORDER BY energy LIMIT ?", (pot_hash, k)).fetchall()
+
+def target_scores(conn, seq_ref, pot_hash=None):
+    """Returns all the stored scores of a target
+
+    Parameters:
+    conn (sqlite3.Connection): The results store connection
+    seq_ref (str): The reference of the target
+    pot_hash (str): The potential hash, default is None (all potentials)
+
+    Returns:
+    list: Returning the (potential_hash, model, energy, structure_hash) tuples
+    """
+    if pot_hash is None:
+        return conn.execute("SELECT potential_hash, model, energy, structure_hash FROM scores WHERE seq_ref = ? ORDER BY potential_hash, model", (seq_ref,)).fetchall()
+
+    return conn.execute("SELECT potential_hash, model, energy, structure_hash FROM scores WHERE seq_ref = ? AND potential_hash = ? ORDER BY model", (seq_ref, pot_hash)).fetchall()
+
+def get_residue_energies(blob):
+    """Converts a stored residues energies blob back to an array
+
+    Parameters:
+    blob (bytes): The residue_energies column value
+
+    Returns:
+    np.ndarray: Returning the float32 residues energies (None if not stored)
+    """
+    return None if blob is None else np.frombuffer(blob, dtype=np.float32)
+
+def store_run(seq_refs, db_path="results.db", decompose=False, batch_size=1000, pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports", size=scoring.block_size, threads=scoring.num_threads, cache_dir=None):
+    """The stored scoring script, it scores the structures which are not already stored with the current potential and records their energies
+
+    Parameters:
+    seq_refs (list): The references of the sequences to be scored
+    db_path (str): The path of the SQLite database file, default is "results.db"
+    decompose (bool): Store the residues energies of each model too, default is False
+    batch_size (int): The number of scores written per transaction, default is 1000
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where the log ratio report is saved, default is "reports"
+    size (int): The number of residues per block side, default is scoring.block_size
+    threads (int): The number of threads, default is scoring.num_threads
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
+
+    Returns:
+    int: Returning the number of new scores
+    """
+    try:
+        log_ratio = scoring.read_report("log_ratio", rpt_dir)
+
+    except OSError:
+        print(f"Can not open the {rpt_dir}/log_ratio.txt report, please run the training first")
+        return 0
+
+    conn = open_store(db_path)
+    pot_hash = add_potential(conn, log_ratio)
+
+    rows = []
+    num_scores = 0
+
+    for seq_ref in seq_refs:
+        try:
+            models = scoring.load_structure(seq_ref, pdb_dir, mdl_dir)
+
+        except OSError:
+            print(f"Can not open the {seq_ref} structure")
+            continue
+
+        structure_hash = models_hash(models)
+        if has_scores(conn, structure_hash, pot_hash, seq_ref):
+            print(f"The {seq_ref} scores are already stored")
+            continue
+
+        if has_scores(conn, structure_hash, pot_hash):
+            num_scores += copy_scores(conn, structure_hash, pot_hash, seq_ref)
+            print(f"The {seq_ref} structure is already scored under another reference, its scores are copied")
+            continue
+
+        for idx, (coords, residues, chains) in enumerate(models):
+            if not decompose:
+                # Without the residues energies, the blocked kernel keeps the memory bounded by the blocks size
+                energy = scoring.calc_energy(scoring.cached_table(coords, residues, chains, cache_dir, size, threads), log_ratio) if cache_dir else scoring.blocked_energy(coords, residues, chains, log_ratio, size, threads)
+                rows.append((structure_hash, pot_hash, idx + 1, seq_ref, energy, None))
+                continue
+
+            table = scoring.cached_table(coords, residues, chains, cache_dir, size, threads) if cache_dir else scoring.blocked_table(coords, residues, chains, size, threads)
+            energies = scoring.residue_energies(table, log_ratio, len(residues))
+            rows.append((structure_hash, pot_hash, idx + 1, seq_ref, float(energies.sum()), energies))
+
+        if len(rows) >= batch_size:
+            add_scores(conn, rows)
+            num_scores += len(rows)
+            rows = []
+
+    add_scores(conn, rows)
+    num_scores += len(rows)
+    conn.close()
+
+    print(f"{num_scores} new scores stored within {db_path} (potential {pot_hash[:12]})")
+    return num_scores
+
+if __name__ == "__main__":
+    print("Welcome to the Results Store Script...")
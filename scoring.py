@@ -0,0 +1,827 @@
+"""
+    This script is a lightweight version of the training and evaluation scripts. It only relies on NumPy, so it can be imported and launched quickly (e.g. by a job scheduler running many short scoring processes)
+
+    To do so:
+        1. It loads the C3' coordinates of each model as NumPy arrays (from the PDB or the .mdl files)
+        2. It computes all the intrachain pairs (i, i+4 and beyond) distances and distance intervals at once
+        3. It trains the objective function by counting the pairs per base pair and distance interval
+        4. It computes the observed frequency, the reference frequency and the log ratio
+        5. It scores a structure by summing the linear interpolation of the log ratio values of its pairs
+        6. It computes the Z-score of a structure against sequence shuffled decoys, re-using the same pairs distances
+        7. It computes the energy gradient with respect to the C3' coordinates (e.g. for a gradient based refinement)
+        8. It decomposes the energy per residue and computes the sliding windows energy profiles
+
+    For very large chains, the pairs can be computed by blocks of the (i, j) triangle on a thread pool (NumPy releases the GIL)
+    The pair tables can be cached (compact .npz files keyed by the structure content hash) and shared by the training, the scoring and the Z-score
+
+    The same thresholds as the training and evaluation scripts are used: 20 A and i, i+4
+    Nothing is computed at import time, and the reports are written without pandas
+"""
+import os
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from settings import pdb_cols, base_list, intervals
+
+# Bases order used to build the pair codes, the pair code is the row index within base_list
+bases = "AUCG"
+num_bins = len(intervals)
+max_distance = float(num_bins)
+min_separation = 4
+
+# Maximum number of (shuffle, pair) values computed at once by the Z-score
+max_block = 1 << 22
+
+# Default blocks size (residues per side, i.e. up to block_size ** 2 pairs per block) and threads number of the blocked kernels
+block_size = 1024
+num_threads = os.cpu_count() or 1
+
+pair_codes = np.full((len(bases), len(bases)), -1, dtype=np.int8)
+for code, pair in enumerate(base_list):
+    pair_codes[bases.index(pair[0]), bases.index(pair[1])] = code
+    pair_codes[bases.index(pair[1]), bases.index(pair[0])] = code
+
+def base_codes(residues):
+    """Returns the index of each residue within the bases order, -1 for the non standard ones
+
+    Parameters:
+    residues (list): The residues names (e.g. ["A", "G", "PSU"])
+
+    Returns:
+    np.ndarray: Returning the bases indexes as int8 array
+    """
+    return np.array([bases.index(res) if len(res) == 1 and res in bases else -1 for res in residues], dtype=np.int8)
+
+def load_pdb(seq_ref, dir_path="PDB", numbers=False):
+    """Loads the C3' atoms of all models for any given PDB file
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be loaded
+    dir_path (str): The directory path where the PDB files are stored, default is "PDB"
+    numbers (bool): Return the residues numbers too, default is False
+
+    Returns:
+    list: Returning one (coords, residues, chains) tuple per model, coords being a N x 3 float array (the residues numbers, including the insertion codes, are added if requested)
+    """
+    models = []
+    residues, chains, coords, res_numbers = [], [], [], []
+
+    with open(f"{dir_path}/{seq_ref}.pdb", "r") as pdb_file:
+        for line in pdb_file:
+            if line[:6] == "ENDMDL":
+                models.append((np.array(coords, dtype=float).reshape(-1, 3), residues, chains, res_numbers))
+                residues, chains, coords, res_numbers = [], [], [], []
+
+            elif line[:4] == "ATOM" and line[12:16].strip() in pdb_cols and line[16] in " A":
+                residues.append(line[17:20].strip())
+                chains.append(line[21])
+                coords.append((float(line[30:38]), float(line[38:46]), float(line[46:54])))
+                res_numbers.append(line[22:27].strip())
+
+    if coords or not models:
+        models.append((np.array(coords, dtype=float).reshape(-1, 3), residues, chains, res_numbers))
+
+    return models if numbers else [model[:3] for model in models]
+
+def count_models(seq_ref, dir_path="pdb_models"):
+    """Returns the number of .mdl files available for any given RNA
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be checked
+    dir_path (str): The directory path where the models are stored, default is "pdb_models"
+
+    Returns:
+    int: Returning the number of models
+    """
+    num_model = 0
+    while os.path.exists(f"{dir_path}/{seq_ref}m{num_model + 1}.mdl"):
+        num_model += 1
+
+    return num_model
+
+def load_model(seq_ref, model=1, dir_path="pdb_models", numbers=False):
+    """Loads the C3' atoms of one model from its .mdl file (generated by the training data_prep)
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be loaded
+    model (int): The model number, default is 1
+    dir_path (str): The directory path where the models are stored, default is "pdb_models"
+    numbers (bool): Return the residues numbers too, default is False
+
+    Returns:
+    tuple: Returning (coords, residues, chains), coords being a N x 3 float array (the residues numbers are added if requested)
+    """
+    residues, chains, coords, res_numbers = [], [], [], []
+
+    with open(f"{dir_path}/{seq_ref}m{model}.mdl", "r") as mdl_file:
+        for line in mdl_file:
+            fields = line.strip().split(";")
+            residues.append(fields[3])
+            chains.append(fields[4])
+            res_numbers.append(fields[5])
+            coords.append((float(fields[6]), float(fields[7]), float(fields[8])))
+
+    if numbers:
+        return np.array(coords, dtype=float).reshape(-1, 3), residues, chains, res_numbers
+
+    return np.array(coords, dtype=float).reshape(-1, 3), residues, chains
+
+def load_structure(seq_ref, pdb_dir="PDB", mdl_dir="pdb_models", numbers=False):
+    """Loads all models of any given RNA, the .mdl files are used if available, the PDB file otherwise
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be loaded
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    numbers (bool): Return the residues numbers too, default is False
+
+    Returns:
+    list: Returning one (coords, residues, chains) tuple per model (the residues numbers are added if requested)
+    """
+    num_model = count_models(seq_ref, mdl_dir)
+
+    if num_model > 0:
+        return [load_model(seq_ref, idx + 1, mdl_dir, numbers) for idx in range(num_model)]
+
+    return load_pdb(seq_ref, pdb_dir, numbers)
+
+def block_table(coords, codes, chains, row_start, row_stop, col_start, col_stop):
+    """Computes the distances of the scored pairs whose first residue is within [row_start, row_stop) and second one within [col_start, col_stop)
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    codes (np.ndarray): The bases indexes returned by base_codes
+    chains (np.ndarray): The chains identifiers
+    row_start, row_stop (int): The first residues range
+    col_start, col_stop (int): The second residues range
+
+    Returns:
+    dict: Returning the pair table of the block (see pair_table)
+    """
+    rows = np.arange(row_start, row_stop)
+    cols = np.arange(col_start, col_stop)
+
+    # Squared distances of the whole block through a matrix product, only used to discard the far pairs before the exact computation
+    sq_rows = (coords[rows]**2).sum(axis=1)
+    sq_cols = (coords[cols]**2).sum(axis=1)
+    sq_dist = sq_rows[:, None] + sq_cols[None, :] - 2 * (coords[rows] @ coords[cols].T)
+
+    keep = sq_dist <= max_distance**2 + 1.
+    keep &= (cols[None, :] >= rows[:, None] + min_separation) & (chains[rows][:, None] == chains[cols][None, :])
+    keep &= (codes[rows] >= 0)[:, None] & (codes[cols] >= 0)[None, :]
+    idx_1, idx_2 = np.nonzero(keep)
+    idx_1 += row_start
+    idx_2 += col_start
+
+    distance = np.sqrt(((coords[idx_1] - coords[idx_2])**2).sum(axis=1))
+    keep = distance <= max_distance
+    idx_1, idx_2, distance = idx_1[keep], idx_2[keep], distance[keep]
+
+    # A distance of exactly 20 A is counted within the last interval, as done by calc_distances
+    dist_bin = np.minimum(distance.astype(np.int64), num_bins - 1).astype(np.int8)
+
+    return {"idx_1": idx_1, "idx_2": idx_2, "code": pair_codes[codes[idx_1], codes[idx_2]], "distance": distance, "bin": dist_bin}
+
+def pair_table(coords, residues, chains):
+    """Computes the distances of all the scored pairs: same chain, separated by at least 3 positions, standard bases and distance up to 20 A
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+
+    Returns:
+    dict: Returning the pairs indexes ("idx_1", "idx_2"), the pair codes ("code", row index within base_list), the distances ("distance") and the intervals indexes ("bin")
+    """
+    return block_table(coords, base_codes(residues), np.asarray(chains), 0, len(residues), 0, len(residues))
+
+def get_blocks(num_atoms, size=block_size):
+    """Returns the blocks tiling the (i, j >= i + 4) triangle of the pairs
+
+    Parameters:
+    num_atoms (int): The number of residues
+    size (int): The number of residues per block side, default is block_size
+
+    Returns:
+    list: Returning the (row_start, row_stop, col_start, col_stop) blocks
+    """
+    if size < 1:
+        raise ValueError(f"The blocks size must be at least 1, got {size}")
+
+    blocks = []
+    for row_start in range(0, num_atoms, size):
+        row_stop = min(row_start + size, num_atoms)
+
+        for col_start in range(row_start, num_atoms, size):
+            if col_start + size - 1 >= row_start + min_separation:
+                blocks.append((row_start, row_stop, col_start, min(col_start + size, num_atoms)))
+
+    return blocks
+
+def blocked_reduce(coords, residues, chains, kernel, size=block_size, threads=num_threads):
+    """Applies a kernel to the pair table of each block on a thread pool, and sums the kernel results
+
+    Each thread keeps its own accumulator, the accumulators are merged at the end. The memory is bounded by the blocks size
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    kernel (function): The function applied to each block pair table (e.g. calc_histogram)
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    object: Returning the sum of the kernel results (None if there is no block)
+    """
+    coords = np.asarray(coords, dtype=float)
+    codes = base_codes(residues)
+    chains = np.asarray(chains)
+    blocks = get_blocks(len(codes), size)
+
+    def worker(thread_blocks):
+        total = None
+        for block in thread_blocks:
+            result = kernel(block_table(coords, codes, chains, *block))
+            total = result if total is None else total + result
+
+        return total
+
+    threads = max(1, min(threads, len(blocks)))
+    if threads == 1:
+        return worker(blocks)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        totals = [total for total in executor.map(worker, [blocks[idx::threads] for idx in range(threads)]) if total is not None]
+
+    return sum(totals[1:], totals[0]) if totals else None
+
+def blocked_table(coords, residues, chains, size=block_size, threads=num_threads):
+    """Computes the pair table of all the scored pairs using the blocked kernel (see blocked_reduce)
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    dict: Returning the pair table (see pair_table), the pairs being ordered by block
+    """
+    tables = blocked_reduce(coords, residues, chains, lambda table: [table], size, threads)
+    if tables is None:
+        return pair_table(np.zeros((0, 3)), [], [])
+
+    return {key: np.concatenate([table[key] for table in tables]) for key in tables[0]}
+
+def structure_hash(coords, residues, chains):
+    """Returns the content hash of a model, including the atoms selection and the thresholds used to build its pair table
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+
+    Returns:
+    str: Returning the sha256 hexadecimal digest
+    """
+    sha = hashlib.sha256()
+    sha.update(np.ascontiguousarray(coords, dtype=float).tobytes())
+    sha.update(";".join(residues).encode())
+    sha.update(";".join(chains).encode())
+    sha.update(f"{','.join(pdb_cols)};{min_separation};{max_distance};{num_bins}".encode())
+
+    return sha.hexdigest()
+
+def save_table(table, file_path):
+    """Saves a pair table within a compact binary file: int32 indexes, int8 pair codes and intervals, float32 distances
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+    file_path (str): The path of the .npz file
+
+    Returns:
+    None: Generates the .npz file (written to a temporary file first, so concurrent readers never see a partial file)
+    """
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "wb") as npz_file:
+        np.savez(npz_file, idx_1=table["idx_1"].astype(np.int32), idx_2=table["idx_2"].astype(np.int32), code=table["code"].astype(np.int8), distance=table["distance"].astype(np.float32), bin=table["bin"].astype(np.int8))
+
+    os.replace(tmp_path, file_path)
+
+def load_table(file_path):
+    """Loads a pair table saved by save_table
+
+    Parameters:
+    file_path (str): The path of the .npz file
+
+    Returns:
+    dict: Returning the pair table, the distances being converted back to float
+    """
+    with np.load(file_path) as npz_file:
+        table = {key: npz_file[key] for key in npz_file.files}
+
+    table["distance"] = table["distance"].astype(float)
+    return table
+
+def cached_table(coords, residues, chains, cache_dir="cache", size=block_size, threads=num_threads):
+    """Returns the pair table of a model from the cache, the table is computed (blocked kernel) and saved if missing
+
+    Only the scored pairs and their intervals are taken from the cache, their distances are computed again from the coordinates,
+    so the energies are the same as without the cache (the cached float32 distances would slightly change them)
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    cache_dir (str): The directory path where the pair tables are cached, default is "cache"
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    dict: Returning the pair table (see pair_table)
+    """
+    coords = np.asarray(coords, dtype=float)
+    file_path = f"{cache_dir}/{structure_hash(coords, residues, chains)}.npz"
+
+    try:
+        table = load_table(file_path)
+
+    except (OSError, ValueError, KeyError):
+        table = blocked_table(coords, residues, chains, size, threads)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        save_table(table, file_path)
+
+        return table
+
+    table["idx_1"], table["idx_2"] = table["idx_1"].astype(np.int64), table["idx_2"].astype(np.int64)
+    table["distance"] = np.sqrt(((coords[table["idx_1"]] - coords[table["idx_2"]])**2).sum(axis=1))
+
+    return table
+
+def calc_histogram(table):
+    """Counts the pairs per base pair and distance interval
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+
+    Returns:
+    np.ndarray: Returning the 10 x 20 counts array (base_list x intervals)
+    """
+    flat_idx = table["code"].astype(np.int64) * num_bins + table["bin"]
+    return np.bincount(flat_idx, minlength=len(base_list) * num_bins).reshape(len(base_list), num_bins)
+
+def calc_frequencies(counts):
+    """Calculates the observed frequency, the reference frequency and the log ratio from the distances counts
+
+    Parameters:
+    counts (np.ndarray): The 10 x 20 counts array
+
+    Returns:
+    tuple: Returning the (obs_freq, ref_freq, log_ratio) arrays, undefined log ratio values are set to 10 as done by calc_log_ratio
+    """
+    counts = np.asarray(counts, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        obs_freq = counts / counts.sum(axis=1, keepdims=True)
+        ref_freq = counts / counts.sum(axis=0, keepdims=True)
+        log_ratio = -1 * np.log10(obs_freq / ref_freq)
+
+    log_ratio[~np.isfinite(log_ratio)] = 10
+
+    return obs_freq, ref_freq, log_ratio
+
+def pair_energies(table, log_ratio, codes=None):
+    """Calculates the energy of each pair using a linear interpolation of the log ratio values
+
+    The log ratio value of an interval is used at its lower bound (i.e. at 0, 1, ..., 19 A), the last value is kept constant up to 20 A
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    codes (np.ndarray): The pair codes to be used instead of the table ones (e.g. shuffled sequences), default is None
+
+    Returns:
+    tuple: Returning the (energies, slopes) arrays, the slopes being the energies derivatives with respect to the distances
+    """
+    if codes is None:
+        codes = table["code"]
+
+    extended = np.concatenate((log_ratio, log_ratio[:, -1:]), axis=1)
+    low = extended[codes, table["bin"]]
+    slopes = extended[codes, table["bin"] + 1] - low
+
+    return low + (table["distance"] - table["bin"]) * slopes, slopes
+
+def calc_energy(table, log_ratio):
+    """Calculates the Gibbs energy of a pair table
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+
+    Returns:
+    float: Returning the gibbs energy
+    """
+    return float(pair_energies(table, log_ratio)[0].sum())
+
+def blocked_histogram(coords, residues, chains, size=block_size, threads=num_threads):
+    """Counts the pairs per base pair and distance interval using the blocked kernel (see blocked_reduce)
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    np.ndarray: Returning the 10 x 20 counts array (base_list x intervals)
+    """
+    counts = blocked_reduce(coords, residues, chains, calc_histogram, size, threads)
+    return np.zeros((len(base_list), num_bins), dtype=np.int64) if counts is None else counts
+
+def blocked_energy(coords, residues, chains, log_ratio, size=block_size, threads=num_threads):
+    """Calculates the Gibbs energy using the blocked kernel (see blocked_reduce)
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    float: Returning the gibbs energy
+    """
+    energy = blocked_reduce(coords, residues, chains, lambda table: calc_energy(table, log_ratio), size, threads)
+    return 0. if energy is None else energy
+
+def calc_gradient(coords, table, log_ratio):
+    """Calculates the Gibbs energy and its gradient with respect to the C3' coordinates
+
+    The pairs beyond 20 A are not scored, the energy step at this threshold is therefore not part of the gradient
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates used to build the pair table
+    table (dict): The pair table returned by pair_table
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+
+    Returns:
+    tuple: Returning the (gibbs energy, N x 3 gradient array)
+    """
+    energies, slopes = pair_energies(table, log_ratio)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(table["distance"] > 0, slopes / table["distance"], 0.)
+
+    # d(distance)/d(coords_1) = (coords_1 - coords_2) / distance, the opposite for coords_2
+    forces = weights[:, None] * (coords[table["idx_1"]] - coords[table["idx_2"]])
+    gradient = np.empty_like(coords, dtype=float)
+    for axis in range(3):
+        gradient[:, axis] = np.bincount(table["idx_1"], forces[:, axis], minlength=len(coords)) - np.bincount(table["idx_2"], forces[:, axis], minlength=len(coords))
+
+    return float(energies.sum()), gradient
+
+def energy_gradient(coords, residues, chains, log_ratio, size=block_size, threads=num_threads):
+    """Calculates the Gibbs energy and its gradient for any given C3' coordinates, the pairs being computed by the blocked kernel
+
+    Parameters:
+    coords (np.ndarray): The N x 3 C3' coordinates
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+
+    Returns:
+    tuple: Returning the (gibbs energy, N x 3 gradient array)
+    """
+    coords = np.asarray(coords, dtype=float)
+    return calc_gradient(coords, blocked_table(coords, residues, chains, size, threads), log_ratio)
+
+def residue_energies(table, log_ratio, num_atoms):
+    """Decomposes the Gibbs energy per residue, each pair energy being shared equally by its two residues
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    num_atoms (int): The number of residues
+
+    Returns:
+    np.ndarray: Returning the energy of each residue (their sum is the gibbs energy)
+    """
+    energies = pair_energies(table, log_ratio)[0] / 2
+    return np.bincount(table["idx_1"], energies, minlength=num_atoms) + np.bincount(table["idx_2"], energies, minlength=num_atoms)
+
+def window_profiles(energies, chains, windows=(5, 11, 21)):
+    """Computes the sliding windows energy profiles from the residues energies, using cumulative sums within each chain
+
+    Parameters:
+    energies (np.ndarray): The residues energies returned by residue_energies
+    chains (list): The chains identifiers
+    windows (list): The windows sizes (odd sizes are centered on the residue), default is (5, 11, 21)
+
+    Returns:
+    dict: Returning the profile of each window size, the residues without a complete window within their chain are set to nan
+    """
+    if any(window < 1 for window in windows):
+        raise ValueError(f"The windows sizes must be at least 1, got {list(windows)}")
+
+    chains = np.asarray(chains)
+    profiles = {window: np.full(len(energies), np.nan) for window in windows}
+
+    for chain in dict.fromkeys(chains.tolist()):
+        positions = np.flatnonzero(chains == chain)
+        cum_sum = np.concatenate(([0.], np.cumsum(energies[positions])))
+
+        for window in windows:
+            if window <= len(positions):
+                first = (window - 1) // 2
+                profiles[window][positions[first:first + len(positions) - window + 1]] = cum_sum[window:] - cum_sum[:-window]
+
+    return profiles
+
+def write_profiles(file_path, residues, chains, res_numbers, energies, profiles, fmt="csv"):
+    """Saves the residues energies and the windows profiles, as one CSV file per chain or as one .npz file
+
+    Parameters:
+    file_path (str): The path of the files without extension (the chain identifier is added for the CSV files)
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    res_numbers (list): The residues numbers (including the insertion codes), as within the PDB files
+    energies (np.ndarray): The residues energies returned by residue_energies
+    profiles (dict): The windows profiles returned by window_profiles
+    fmt (str): The files format, "csv" or "npz", default is "csv"
+
+    Returns:
+    None: Generates the profiles files, the .npz file includes the "chains", "numbers", "residues", "windows", "energies" and "profiles" (N x windows) arrays
+    """
+    if fmt == "npz":
+        np.savez(f"{file_path}.npz", chains=np.asarray(chains), numbers=np.asarray(res_numbers), residues=np.asarray(residues), windows=np.array(list(profiles), dtype=np.int64), energies=energies, profiles=np.column_stack(list(profiles.values())).reshape(len(energies), len(profiles)))
+        return
+
+    values = np.column_stack([energies] + list(profiles.values()))
+    chains = np.asarray(chains)
+    for chain in dict.fromkeys(chains.tolist()):
+        positions = np.flatnonzero(chains == chain)
+
+        with open(f"{file_path}_{chain}.csv", "w") as csv_file:
+            csv_file.write(";".join(["position", "number", "residue", "energy"] + [f"window_{window}" for window in profiles]) + "\n")
+
+            for position, idx in enumerate(positions):
+                csv_file.write(";".join([f"{position + 1}", res_numbers[idx], residues[idx]] + ["" if value != value else f"{value}" for value in values[idx].tolist()]) + "\n")
+
+def shuffle_codes(residues, chains, num_shuffle, rng):
+    """Generates sequence shuffled versions of a model, the standard bases are permuted within each chain
+
+    Parameters:
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    num_shuffle (int): The number of shuffled sequences
+    rng (np.random.Generator): The random numbers generator
+
+    Returns:
+    np.ndarray: Returning the num_shuffle x N bases indexes array, the non standard residues are kept in place
+    """
+    codes = base_codes(residues)
+    std_idx = np.flatnonzero(codes >= 0)
+    _, chain_rank = np.unique(np.asarray(chains)[std_idx], return_inverse=True)
+
+    # Sorting random keys shifted by the chain rank gives a random order within each chain block
+    chain_order = std_idx[np.argsort(chain_rank, kind="stable")]
+    shuffle_order = std_idx[np.argsort(chain_rank + rng.random((num_shuffle, len(std_idx))), axis=1)]
+
+    shuffled = np.tile(codes, (num_shuffle, 1))
+    shuffled[:, chain_order] = codes[shuffle_order]
+
+    return shuffled
+
+def calc_zscore(table, residues, chains, log_ratio, num_shuffle=100, seed=None):
+    """Calculates the Z-score of a model against sequence shuffled decoys
+
+    The pairs distances and intervals are computed once, each shuffled sequence only changes the pair codes used to read the log ratio table
+
+    Parameters:
+    table (dict): The pair table returned by pair_table
+    residues (list): The residues names
+    chains (list): The chains identifiers
+    log_ratio (np.ndarray): The 10 x 20 log ratio array
+    num_shuffle (int): The number of shuffled sequences, default is 100
+    seed (int): The random numbers generator seed, default is None
+
+    Returns:
+    dict: Returning the model "energy", the "mean" and the "std" of the shuffled energies and the "zscore"
+    """
+    if num_shuffle < 1:
+        raise ValueError(f"The number of shuffled sequences must be at least 1, got {num_shuffle}")
+
+    rng = np.random.default_rng(seed)
+    energy = calc_energy(table, log_ratio)
+    batch_size = max(1, max_block // max(1, len(table["bin"])))
+
+    shuffled_energies = []
+    for start in range(0, num_shuffle, batch_size):
+        shuffled = shuffle_codes(residues, chains, min(batch_size, num_shuffle - start), rng)
+        shuffled_pairs = pair_codes[shuffled[:, table["idx_1"]], shuffled[:, table["idx_2"]]]
+        shuffled_energies.append(pair_energies(table, log_ratio, shuffled_pairs)[0].sum(axis=1))
+
+    shuffled_energies = np.concatenate(shuffled_energies)
+    mean, std = float(shuffled_energies.mean()), float(shuffled_energies.std())
+    zscore = (energy - mean) / std if std > 0 else 0.
+
+    return {"energy": energy, "mean": mean, "std": std, "zscore": zscore}
+
+def write_report(values, report, rpt_dir="reports"):
+    """Writes a 10 x 20 array to a report file using the same format as the training reports
+
+    Parameters:
+    values (np.ndarray): The 10 x 20 array to be saved
+    report (str): The report name (e.g. "log_ratio")
+    rpt_dir (str): The directory path where report will be saved, default is "reports"
+
+    Returns:
+    None: Generates the report file
+    """
+    with open(f"{rpt_dir}/{report}.txt", "w") as file_report:
+        file_report.write(";".join(["Bases"] + intervals) + "\n")
+
+        for pair, row in zip(base_list, values):
+            file_report.write(";".join([pair] + ["" if value != value else f"{value}" for value in row.tolist()]) + "\n")
+
+def read_report(report, rpt_dir="reports"):
+    """Reads a 10 x 20 report file generated by the training script or by write_report
+
+    Parameters:
+    report (str): The report name (e.g. "log_ratio")
+    rpt_dir (str): The directory path where report are saved, default is "reports"
+
+    Returns:
+    np.ndarray: Returning the 10 x 20 float array ordered as base_list
+    """
+    values = np.full((len(base_list), num_bins), np.nan)
+
+    with open(f"{rpt_dir}/{report}.txt", "r") as file_report:
+        file_report.readline()
+
+        for line in file_report:
+            fields = line.strip().split(";")
+            if fields[0] in base_list:
+                values[base_list.index(fields[0])] = [float(field) if field else np.nan for field in fields[1:]]
+
+    return values
+
+def training_run(seq_refs, pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports", size=block_size, threads=num_threads, cache_dir=None):
+    """The lightweight training script, it counts the distances of all models of all given RNA and generates the four reports
+
+    Parameters:
+    seq_refs (list): The references of the sequences used for the training
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where report will be saved, default is "reports"
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
+
+    Returns:
+    tuple: Returning the 10 x 20 log ratio array and the references of the sequences actually used (None if no model was counted, the reports are then left unchanged)
+    """
+    counts = np.zeros((len(base_list), num_bins), dtype=np.int64)
+    num_models = 0
+    trained_refs = []
+
+    for seq_ref in seq_refs:
+        print(f"Training using {seq_ref} started")
+
+        try:
+            models = load_structure(seq_ref, pdb_dir, mdl_dir)
+
+        except OSError:
+            print(f"Can not open the {seq_ref} structure")
+            continue
+
+        for coords, residues, chains in models:
+            if cache_dir:
+                counts += calc_histogram(cached_table(coords, residues, chains, cache_dir, size, threads))
+            else:
+                counts += blocked_histogram(coords, residues, chains, size, threads)
+
+            num_models += 1
+
+        trained_refs.append(seq_ref)
+
+    if num_models == 0:
+        print("No structure could be used for the training, the reports are not written")
+        return None
+
+    obs_freq, ref_freq, log_ratio = calc_frequencies(counts)
+
+    write_report(counts, "distances", rpt_dir)
+    write_report(obs_freq, "obs_freq", rpt_dir)
+    write_report(ref_freq, "ref_freq", rpt_dir)
+    write_report(log_ratio, "log_ratio", rpt_dir)
+
+    return log_ratio, trained_refs
+
+def evaluation_run(seq_ref, pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports", log_ratio=None, size=block_size, threads=num_threads, cache_dir=None):
+    """The lightweight evaluation script, it computes the Gibbs energy of each model of any given RNA
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be scored
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where the log ratio report is saved, default is "reports"
+    log_ratio (np.ndarray): The 10 x 20 log ratio array, read from the log ratio report if not given
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
+
+    Returns:
+    np.ndarray: Returning the gibbs energy of each model
+    """
+    if log_ratio is None:
+        log_ratio = read_report("log_ratio", rpt_dir)
+
+    energies = []
+    for coords, residues, chains in load_structure(seq_ref, pdb_dir, mdl_dir):
+        if cache_dir:
+            energies.append(calc_energy(cached_table(coords, residues, chains, cache_dir, size, threads), log_ratio))
+        else:
+            energies.append(blocked_energy(coords, residues, chains, log_ratio, size, threads))
+
+    energies = np.array(energies)
+
+    print(f"The Gibbs energy of {seq_ref} is: {energies.sum()}")
+    return energies
+
+def zscore_run(seq_ref, num_shuffle=100, seed=None, pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports", log_ratio=None, size=block_size, threads=num_threads, cache_dir=None):
+    """The Z-score script, it compares the Gibbs energy of each model of any given RNA to the energies of its shuffled sequences
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be scored
+    num_shuffle (int): The number of shuffled sequences per model, default is 100
+    seed (int): The random numbers generator seed, default is None
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where the log ratio report is saved, default is "reports"
+    log_ratio (np.ndarray): The 10 x 20 log ratio array, read from the log ratio report if not given
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
+
+    Returns:
+    list: Returning the calc_zscore results of each model
+    """
+    if log_ratio is None:
+        log_ratio = read_report("log_ratio", rpt_dir)
+
+    results = []
+    for idx, (coords, residues, chains) in enumerate(load_structure(seq_ref, pdb_dir, mdl_dir)):
+        table = cached_table(coords, residues, chains, cache_dir, size, threads) if cache_dir else blocked_table(coords, residues, chains, size, threads)
+        result = calc_zscore(table, residues, chains, log_ratio, num_shuffle, seed)
+        print(f"Seq. {seq_ref} - Model No. {idx + 1}: energy {result['energy']}, shuffled mean {result['mean']}, shuffled std {result['std']}, Z-score {result['zscore']}")
+        results.append(result)
+
+    return results
+
+def decomposition_run(seq_ref, windows=(5, 11, 21), out_dir="reports", fmt="csv", pdb_dir="PDB", mdl_dir="pdb_models", rpt_dir="reports", log_ratio=None, size=block_size, threads=num_threads, cache_dir=None):
+    """The decomposition script, it computes the energy of each residue and the sliding windows profiles of each model of any given RNA
+
+    Parameters:
+    seq_ref (str): The reference of the sequence to be scored
+    windows (list): The windows sizes, default is (5, 11, 21)
+    out_dir (str): The directory path where the profiles will be saved, default is "reports"
+    fmt (str): The profiles files format, "csv" (one file per chain) or "npz", default is "csv"
+    pdb_dir (str): The directory path where the PDB files are stored, default is "PDB"
+    mdl_dir (str): The directory path where the models are stored, default is "pdb_models"
+    rpt_dir (str): The directory path where the log ratio report is saved, default is "reports"
+    log_ratio (np.ndarray): The 10 x 20 log ratio array, read from the log ratio report if not given
+    size (int): The number of residues per block side, default is block_size
+    threads (int): The number of threads, default is num_threads
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
+
+    Returns:
+    list: Returning the residues energies of each model
+    """
+    if log_ratio is None:
+        log_ratio = read_report("log_ratio", rpt_dir)
+
+    results = []
+    for idx, (coords, residues, chains, res_numbers) in enumerate(load_structure(seq_ref, pdb_dir, mdl_dir, numbers=True)):
+        table = cached_table(coords, residues, chains, cache_dir, size, threads) if cache_dir else blocked_table(coords, residues, chains, size, threads)
+        energies = residue_energies(table, log_ratio, len(residues))
+
+        write_profiles(f"{out_dir}/{seq_ref}m{idx + 1}", residues, chains, res_numbers, energies, window_profiles(energies, chains, windows), fmt)
+        highest = f"{energies.max()} (residue {res_numbers[energies.argmax()]} of chain {chains[energies.argmax()]})" if len(energies) else "undefined (no residue)"
+        print(f"Seq. {seq_ref} - Model No. {idx + 1}: the Gibbs energy is {energies.sum()}, the highest residue energy is {highest}")
+        results.append(energies)
+
+    return results
+
+if __name__ == "__main__":
+    print("Welcome to the Scoring Script...")
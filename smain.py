@@ -0,0 +1,249 @@
+"""
+    This code was developed for the RNA folding energy estimation
+    Two main steps are available: (i) training and (ii) scoring, the plots are optional
+
+    This version was developed for short command line runs (e.g. job schedulers launching many scoring processes):
+    only NumPy is imported at startup and nothing is done at import time, matplotlib and pandas are loaded only when the plots are requested
+"""
+import argparse
+
+from settings import __version__, __author__
+
+def get_parser():
+    """Returns the command line parser of the lightweight version
+
+    Parameters: None
+
+    Returns:
+    argparse.ArgumentParser: Returning the parser including the train and score commands
+    """
+    dirs = argparse.ArgumentParser(add_help=False)
+    dirs.add_argument('--pdb-dir', type=str, default="PDB", help="The directory where the PDB files are stored")
+    dirs.add_argument('--mdl-dir', type=str, default="pdb_models", help="The directory where the models (.mdl) are stored, they are used instead of the PDB files if available")
+    dirs.add_argument('--rpt-dir', type=str, default="reports", help="The directory where the reports are stored")
+
+    common = argparse.ArgumentParser(add_help=False, parents=[dirs])
+    common.add_argument('-t', '--threads', type=positive_int, help="The number of threads computing the pairs of one chain, default is the number of CPUs")
+    common.add_argument('-b', '--block-size', type=positive_int, help="The number of residues per block side of the pairs computation, default is 1024")
+    common.add_argument('--cache-dir', type=str, help="Cache the pair tables (distances and intervals of each model) within the given directory, and re-use them")
+
+    parser = argparse.ArgumentParser(description=f"Welcome to the RNA Folding Energy Estimator {__version__} (lightweight version). Created by {__author__}")
+    commands = parser.add_subparsers(dest="command")
+
+    train = commands.add_parser("train", parents=[common], help="Train the objective function on a set of RNA")
+    train.add_argument('seq', type=str, nargs="*", help="The sequence references used for the training")
+    train.add_argument('-l', '--list', type=str, help="File where the sequence references are stored")
+    train.add_argument('--plot', action="store_true", help="Plot the interaction profiles (loads matplotlib and pandas)")
+    train.add_argument('--plt-dir', type=str, default="plot", help="The directory where the plots will be saved")
+    train.add_argument('--store', type=str, help="Record the trained potential within the given results store (SQLite file)")
+
+    quick = commands.add_parser("quick-train", parents=[dirs], help="Train an approximate objective function from a sample of the pairs of each structure")
+    quick.add_argument('seq', type=str, nargs="*", help="The sequence references used for the training")
+    quick.add_argument('-l', '--list', type=str, help="File where the sequence references are stored")
+    quick.add_argument('--budget', type=positive_int, default=5000, help="The number of pairs sampled per model, default is 5000")
+    quick.add_argument('--mode', type=str, choices=["uniform", "stratified"], default="stratified", help="Sample the pairs uniformly or stratified by chain and sequence separation, default is stratified")
+    quick.add_argument('--tol', type=float, default=0.01, help="Stop once the log ratio changes less than the tolerance between two checks, default is 0.01")
+    quick.add_argument('--check-every', type=positive_int, default=10, help="The number of structures between two convergence checks, default is 10")
+    quick.add_argument('--seed', type=int, help="The random seed used to sample the pairs")
+    quick.add_argument('--store', type=str, help="Record the trained potential within the given results store (SQLite file)")
+
+    score = commands.add_parser("score", parents=[common], help="Compute the Gibbs energy of a set of RNA")
+    score.add_argument('seq', type=str, nargs="*", help="The sequence references to be scored")
+    score.add_argument('-l', '--list', type=str, help="File where the sequence references are stored")
+    score.add_argument('-z', '--zscore', type=positive_int, metavar="N", help="Report the Z-score against N sequence shuffled decoys")
+    score.add_argument('--seed', type=int, help="The random seed used to shuffle the sequences")
+    score.add_argument('-d', '--decompose', action="store_true", help="Save the energy of each residue and its sliding windows profiles")
+    score.add_argument('-w', '--windows', type=window_size, nargs="+", default=[5, 11, 21], help="The sliding windows sizes of the decomposition, default is 5 11 21")
+    score.add_argument('--format', type=str, choices=["csv", "npz"], default="csv", help="The decomposition files format, one CSV file per chain or one NumPy .npz file (including the chains, the residues numbers and the windows sizes), default is csv")
+    score.add_argument('--out-dir', type=str, default="reports", help="The directory where the decomposition files will be saved")
+    score.add_argument('--store', type=str, help="Record the energies within the given results store (SQLite file), the structures already scored with the same potential are skipped. With -d the residues energies are stored instead of being saved to files")
+
+    bench = commands.add_parser("bench", help="Benchmark the native-vs-decoys discrimination of the trained objective function")
+    bench.add_argument('--pdb-dir', type=str, default="PDB", help="The directory where the native PDB file is stored")
+    bench.add_argument('--rpt-dir', type=str, default="reports", help="The directory where the reports are stored")
+    bench.add_argument('native', type=str, help="The sequence reference of the native structure")
+    bench.add_argument('decoys', type=str, help="The directory where the decoys PDB files are stored")
+    bench.add_argument('--top', type=float, default=0.1, help="The fraction of lowest energy decoys used for the enrichment, default is 0.1")
+    bench.add_argument('-o', '--output', type=str, help="CSV file where the energy and the RMSD of each decoy will be saved")
+
+    query = commands.add_parser("query", help="Query the scores recorded within a results store")
+    query.add_argument('store', type=str, help="The results store (SQLite file)")
+    query.add_argument('seq', type=str, nargs="?", help="The sequence reference of the target, the top scores are returned if not given")
+    query.add_argument('-k', '--top', type=int, default=10, help="The number of lowest energy models returned, default is 10")
+    query.add_argument('--potential', type=str, help="The potential hash, default is the hash of the current log ratio report")
+    query.add_argument('--rpt-dir', type=str, default="reports", help="The directory where the reports are stored")
+
+    return parser
+
+def window_size(value):
+    """Converts a window size given on the command line, which must be a positive integer
+
+    Parameters:
+    value (str): The command line value
+
+    Returns:
+    int: Returning the window size
+    """
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"the window size must be at least 1, got {size}")
+
+    return size
+
+def positive_int(value):
+    """Converts a number given on the command line, which must be a positive integer
+
+    Parameters:
+    value (str): The command line value
+
+    Returns:
+    int: Returning the number
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+
+    return number
+
+def get_seq_refs(args):
+    """Returns the sequence references given on the command line and within the list file
+
+    Parameters:
+    args (argparse.Namespace): The parsed command line arguments
+
+    Returns:
+    list: Returning the upper case sequence references
+    """
+    seq_refs = [seq.upper() for seq in args.seq]
+
+    if args.list:
+        try:
+            with open(args.list) as my_list:
+                seq_refs += [pdb.strip().upper() for pdb in my_list if pdb.strip()]
+
+        except:
+            print(f"The file {args.list} does not exist")
+
+    return seq_refs
+
+def query_store(args):
+    """Prints the top scores, or the scores of one target, recorded within a results store
+
+    Parameters:
+    args (argparse.Namespace): The parsed command line arguments of the query command
+
+    Returns: None
+    """
+    import scoring
+    from results_store import open_store, potential_hash, top_scores, target_scores
+
+    conn = open_store(args.store)
+    pot_hash = args.potential
+
+    if pot_hash is None:
+        try:
+            pot_hash = potential_hash(scoring.read_report("log_ratio", args.rpt_dir))
+
+        except OSError:
+            print(f"Can not open the {args.rpt_dir}/log_ratio.txt report, please give the potential hash")
+            return
+
+    if args.seq:
+        for pot, model, energy, structure_hash in target_scores(conn, args.seq.upper(), pot_hash):
+            print(f"{args.seq.upper()};{model};{energy};{structure_hash};{pot}")
+
+    else:
+        for seq_ref, model, energy, structure_hash in top_scores(conn, pot_hash, args.top):
+            print(f"{seq_ref};{model};{energy};{structure_hash}")
+
+    conn.close()
+
+def main(argv=None):
+    """The main function of the lightweight version
+
+    Parameters:
+    argv (list): The command line arguments, sys.argv is used if not given
+
+    Returns: None
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+        return
+
+    if args.command == "score" and args.store and args.zscore:
+        parser.error("the Z-score (-z) can not be recorded within the results store (--store), please run them separately")
+
+    if args.command == "score" and args.decompose and args.zscore:
+        parser.error("the decomposition (-d) and the Z-score (-z) can not be combined, please run them separately")
+
+    import scoring
+
+    if args.command == "query":
+        query_store(args)
+        return
+
+    if args.command == "bench":
+        from discrimination import discrimination_run
+        discrimination_run(args.native.upper(), args.decoys, args.pdb_dir, args.rpt_dir, args.top, args.output)
+        return
+
+    seq_refs = get_seq_refs(args)
+
+    if args.command == "quick-train":
+        from quick_training import quick_training_run
+        results = quick_training_run(seq_refs, args.budget, args.mode, args.tol, args.check_every, args.seed, args.pdb_dir, args.mdl_dir, args.rpt_dir)
+        if results is None:
+            return
+
+        trained_refs = results["seq_refs"]
+
+    else:
+        size = scoring.block_size if args.block_size is None else args.block_size
+        threads = scoring.num_threads if args.threads is None else args.threads
+
+    if args.command == "train":
+        results = scoring.training_run(seq_refs, args.pdb_dir, args.mdl_dir, args.rpt_dir, size, threads, args.cache_dir)
+        if results is None:
+            return
+
+        trained_refs = results[1]
+
+        if args.plot:
+            from plot import plot
+            plot(args.rpt_dir, args.plt_dir)
+
+    elif args.command == "score" and args.store:
+        from results_store import store_run
+        store_run(seq_refs, args.store, args.decompose, pdb_dir=args.pdb_dir, mdl_dir=args.mdl_dir, rpt_dir=args.rpt_dir, size=size, threads=threads, cache_dir=args.cache_dir)
+
+    elif args.command == "score":
+        try:
+            log_ratio = scoring.read_report("log_ratio", args.rpt_dir)
+
+        except OSError:
+            print(f"Can not open the {args.rpt_dir}/log_ratio.txt report, please run the training first")
+            return
+
+        for seq_ref in seq_refs:
+            try:
+                if args.decompose:
+                    scoring.decomposition_run(seq_ref, args.windows, args.out_dir, args.format, args.pdb_dir, args.mdl_dir, log_ratio=log_ratio, size=size, threads=threads, cache_dir=args.cache_dir)
+                elif args.zscore:
+                    scoring.zscore_run(seq_ref, args.zscore, args.seed, args.pdb_dir, args.mdl_dir, log_ratio=log_ratio, size=size, threads=threads, cache_dir=args.cache_dir)
+                else:
+                    scoring.evaluation_run(seq_ref, args.pdb_dir, args.mdl_dir, log_ratio=log_ratio, size=size, threads=threads, cache_dir=args.cache_dir)
+
+            except OSError:
+                print(f"Can not open the {seq_ref} structure")
+
+    if args.command in ["train", "quick-train"] and args.store:
+        from results_store import open_store, add_potential
+        conn = open_store(args.store)
+        print(f"The potential {add_potential(conn, scoring.read_report('log_ratio', args.rpt_dir), trained_refs)} is recorded within {args.store}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts are not packaged, the repository root is added to the path so the tests can import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+"""
+    Tests of the discrimination benchmark script
+"""
+import os
+import numpy as np
+
+import scoring
+import discrimination
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def kabsch_rmsd(coords, reference):
+    """Returns the RMSD of one conformation after applying its optimal rotation (Kabsch)"""
+    coords = coords - coords.mean(axis=0)
+    reference = reference - reference.mean(axis=0)
+
+    u, _, vt = np.linalg.svd(coords.T @ reference)
+    sign = np.sign(np.linalg.det(u @ vt))
+    rotation = u @ np.diag([1., 1., sign]) @ vt
+
+    return np.sqrt(((coords @ rotation - reference)**2).sum(axis=1).mean())
+
+def random_rotation(rng):
+    """Returns a random proper rotation matrix"""
+    q, r = np.linalg.qr(rng.normal(size=(3, 3)))
+    q *= np.sign(np.diag(r))
+
+    return q * np.sign(np.linalg.det(q))
+
+def test_batch_rmsd_matches_per_decoy_superposition():
+    rng = np.random.default_rng(0)
+    native = scoring.load_pdb("4P5J", os.path.join(root_dir, "PDB"))[0][0]
+
+    decoys = np.array([(native + rng.normal(scale=scale, size=native.shape)) @ random_rotation(rng) + rng.normal(size=3) for scale in np.linspace(0., 5., 20)])
+    # A mirror image needs the reflection correction
+    decoys = np.concatenate((decoys, -native[None]))
+
+    rmsd = discrimination.batch_rmsd(decoys, native)
+
+    assert np.abs(rmsd - [kabsch_rmsd(decoy, native) for decoy in decoys]).max() < 1e-6
+    assert rmsd[0] < 0.05
+
+def test_ranks_average_the_ties():
+    assert np.array_equal(discrimination.calc_ranks(np.array([3., 1., 3., 2., 3.])), [4., 1., 4., 2., 4.])
+
+def test_spearman_correlation():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=50)
+
+    assert np.isclose(discrimination.calc_spearman(values, np.exp(values)), 1.)
+    assert np.isclose(discrimination.calc_spearman(values, -values**3), -1.)
+
+    # Without ties, the usual 1 - 6 sum(d^2) / (n (n^2 - 1)) formula
+    other = rng.normal(size=50)
+    rank_diff = discrimination.calc_ranks(values) - discrimination.calc_ranks(other)
+    assert np.isclose(discrimination.calc_spearman(values, other), 1 - 6 * (rank_diff**2).sum() / (50 * (50**2 - 1)))
+
+def test_enrichment():
+    rmsd = np.arange(100.)
+
+    assert np.isclose(discrimination.calc_enrichment(rmsd, rmsd, 0.1), 10.)
+    assert np.isclose(discrimination.calc_enrichment(-rmsd, rmsd, 0.1), 0.)
+    assert np.isclose(discrimination.calc_enrichment(np.r_[rmsd[:5], rmsd[50:55], rmsd[5:50], rmsd[55:]], rmsd, 0.1), 5.)
+
+def test_decoys_with_another_sequence_are_skipped(tmp_path):
+    with open(os.path.join(root_dir, "PDB", "4P5J.pdb")) as pdb_file:
+        lines = [line for line in pdb_file if line[:4] == "ATOM"]
+
+    _, residues, _ = scoring.load_pdb("4P5J", os.path.join(root_dir, "PDB"))[0]
+    mutated = [line[:17] + ("  C" if line[17:20] == "  G" else line[17:20]) + line[20:] for line in lines]
+
+    (tmp_path / "same.pdb").write_text("".join(lines))
+    (tmp_path / "mutated.pdb").write_text("".join(mutated))
+    (tmp_path / "short.pdb").write_text("".join(lines[:-50]))
+
+    batches = list(discrimination.load_decoys(discrimination.get_decoys(str(tmp_path)), str(tmp_path), residues, batch_size=2))
+
+    assert [names for names, _ in batches] == [["same"], []]
+    assert batches[0][1].shape == (1, len(residues), 3)
@@ -0,0 +1,65 @@
+"""
+    Tests of the quick training script
+"""
+import os
+import numpy as np
+import pytest
+
+import scoring
+import quick_training
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_log_ratio_standard_errors_match_repeated_samples():
+    coords, residues, chains = scoring.load_model("4P5J", 1, os.path.join(root_dir, "pdb_models"))
+    rng = np.random.default_rng(0)
+
+    log_ratios, standard_errors = [], []
+    for _ in range(200):
+        counts, variances, _ = quick_training.sample_counts(coords, residues, chains, 1500, "uniform", rng)
+        results = quick_training.calc_standard_errors(counts, variances)
+        log_ratios.append(np.where(counts > 0, results["log_ratio"], np.nan))
+        standard_errors.append(results["log_ratio_se"])
+
+    log_ratios, standard_errors = np.array(log_ratios), np.array(standard_errors)
+
+    # Only the intervals sampled by almost every run are compared, the rare ones switch between defined and undefined
+    defined = np.isfinite(log_ratios).mean(axis=0) > 0.95
+    ratio = np.nanmedian(standard_errors[:, defined], axis=0) / np.nanstd(log_ratios[:, defined], axis=0)
+
+    assert defined.sum() > 30
+    assert 0.85 < np.median(ratio) < 1.15
+    assert np.mean((ratio > 0.7) & (ratio < 1.4)) > 0.9
+
+def test_full_budget_gives_exact_counts():
+    coords, residues, chains = scoring.load_model("4P5J", 1, os.path.join(root_dir, "pdb_models"))
+    exact = scoring.calc_histogram(scoring.pair_table(coords, residues, chains))
+
+    for mode in ["uniform", "stratified"]:
+        counts, variances, _ = quick_training.sample_counts(coords, residues, chains, 10**6, mode, np.random.default_rng(0))
+
+        assert np.array_equal(counts, exact)
+        assert not variances.any()
+
+def test_full_budget_with_several_chains():
+    coords, residues, chains = scoring.load_model("4P5J", 1, os.path.join(root_dir, "pdb_models"))
+    chains = ["A"] * 40 + ["B"] * (len(residues) - 40)
+    exact = scoring.calc_histogram(scoring.pair_table(coords, residues, chains))
+
+    counts, _, _ = quick_training.sample_counts(coords, residues, chains, 10**6, "stratified", np.random.default_rng(0))
+
+    assert np.array_equal(counts, exact)
+
+def test_non_contiguous_chains_are_rejected():
+    with pytest.raises(ValueError):
+        quick_training.get_strata(["A"] * 10 + ["B"] * 10 + ["A"] * 10)
+
+def test_reports_include_the_frequencies_standard_errors(tmp_path):
+    quick_training.quick_training_run(["4P5J"], budget=500, seed=0, pdb_dir=os.path.join(root_dir, "PDB"), mdl_dir=os.path.join(root_dir, "pdb_models"), rpt_dir=str(tmp_path))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(f"{report}.txt" for report in ["distances", "obs_freq", "obs_freq_se", "ref_freq", "ref_freq_se", "log_ratio", "log_ratio_se"])
+    assert np.all(np.isfinite(scoring.read_report("obs_freq_se", str(tmp_path))))
+
+def test_training_without_structure_keeps_the_reports(tmp_path):
+    assert quick_training.quick_training_run(["NOPE"], pdb_dir=str(tmp_path), mdl_dir=str(tmp_path), rpt_dir=str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,63 @@
+"""
+    Tests of the results store script
+"""
+import os
+import shutil
+import numpy as np
+
+import results_store
+import smain
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_add_potential_fills_missing_training_references(tmp_path):
+    conn = results_store.open_store(str(tmp_path / "results.db"))
+    log_ratio = np.arange(200, dtype=float).reshape(10, 20)
+
+    pot_hash = results_store.add_potential(conn, log_ratio)
+    assert results_store.add_potential(conn, log_ratio, ["4P5J", "1A1T"]) == pot_hash
+    results_store.add_potential(conn, log_ratio, ["OTHER"])
+
+    assert conn.execute("SELECT seq_refs FROM potentials WHERE potential_hash = ?", (pot_hash,)).fetchall() == [("4P5J;1A1T",)]
+
+def test_scores_queries(tmp_path):
+    conn = results_store.open_store(str(tmp_path / "results.db"))
+    results_store.add_scores(conn, [("s1", "p", 1, "4P5J", 2.0, None), ("s1", "p", 2, "4P5J", -1.0, np.ones(3)), ("s2", "p", 1, "1A1T", 0.5, None)])
+
+    assert results_store.has_scores(conn, "s1", "p")
+    assert not results_store.has_scores(conn, "s1", "other")
+    assert [row[:3] for row in results_store.top_scores(conn, "p", 2)] == [("4P5J", 2, -1.0), ("1A1T", 1, 0.5)]
+    assert [row[1] for row in results_store.target_scores(conn, "4P5J", "p")] == [1, 2]
+
+def test_identical_structures_are_stored_under_each_reference(tmp_path):
+    for seq_ref in ["4P5J", "COPY"]:
+        shutil.copy(os.path.join(root_dir, "PDB", "4P5J.pdb"), tmp_path / f"{seq_ref}.pdb")
+    db_path = str(tmp_path / "results.db")
+    dirs = {"pdb_dir": str(tmp_path), "mdl_dir": str(tmp_path), "rpt_dir": os.path.join(root_dir, "reports")}
+
+    assert results_store.store_run(["4P5J"], db_path, **dirs) == 1
+    assert results_store.store_run(["COPY", "4P5J"], db_path, **dirs) == 1
+
+    conn = results_store.open_store(db_path)
+    assert results_store.target_scores(conn, "COPY") == results_store.target_scores(conn, "4P5J")
+    assert len(results_store.target_scores(conn, "COPY")) == 1
+
+def test_stored_energies_do_not_depend_on_the_decomposition(tmp_path):
+    dirs = {"pdb_dir": os.path.join(root_dir, "PDB"), "mdl_dir": os.path.join(root_dir, "pdb_models"), "rpt_dir": os.path.join(root_dir, "reports")}
+    results_store.store_run(["4P5J"], str(tmp_path / "energy.db"), **dirs)
+    results_store.store_run(["4P5J"], str(tmp_path / "residues.db"), decompose=True, **dirs)
+
+    energy = results_store.open_store(str(tmp_path / "energy.db")).execute("SELECT energy, residue_energies FROM scores").fetchone()
+    residues = results_store.open_store(str(tmp_path / "residues.db")).execute("SELECT energy, residue_energies FROM scores").fetchone()
+
+    assert energy[1] is None
+    assert np.isclose(energy[0], residues[0])
+    assert np.isclose(results_store.get_residue_energies(residues[1]).sum(), residues[0], atol=1e-4)
+
+def test_trained_potential_records_the_used_references(tmp_path):
+    rpt_dir = tmp_path / "reports"
+    rpt_dir.mkdir()
+    smain.main(["train", "4P5J", "NOPE", "--pdb-dir", os.path.join(root_dir, "PDB"), "--mdl-dir", os.path.join(root_dir, "pdb_models"), "--rpt-dir", str(rpt_dir), "--store", str(tmp_path / "results.db")])
+
+    conn = results_store.open_store(str(tmp_path / "results.db"))
+    assert conn.execute("SELECT seq_refs FROM potentials").fetchall() == [("4P5J",)]
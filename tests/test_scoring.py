@@ -0,0 +1,206 @@
+"""
+    Tests of the lightweight scoring script
+"""
+import os
+import numpy as np
+import pytest
+
+import scoring
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_4p5j():
+    """Returns the (coords, residues, chains) of the 4P5J model stored within pdb_models"""
+    return scoring.load_model("4P5J", 1, os.path.join(root_dir, "pdb_models"))
+
+def synthetic_log_ratio(seed=0):
+    """Returns a random 10 x 20 log ratio table"""
+    return np.random.default_rng(seed).normal(size=(len(scoring.base_list), scoring.num_bins))
+
+def numeric_gradient(coords, residues, chains, log_ratio, step=1e-5):
+    """Returns the central finite differences gradient of the Gibbs energy"""
+    gradient = np.zeros_like(coords)
+
+    for idx in np.ndindex(coords.shape):
+        shifted = coords.copy()
+        shifted[idx] += step
+        energy_up = scoring.calc_energy(scoring.pair_table(shifted, residues, chains), log_ratio)
+        shifted[idx] -= 2 * step
+        energy_down = scoring.calc_energy(scoring.pair_table(shifted, residues, chains), log_ratio)
+        gradient[idx] = (energy_up - energy_down) / (2 * step)
+
+    return gradient
+
+def test_energy_gradient_matches_finite_differences():
+    coords, residues, chains = load_4p5j()
+    log_ratio = synthetic_log_ratio()
+
+    energy, gradient = scoring.energy_gradient(coords, residues, chains, log_ratio)
+
+    assert gradient.shape == coords.shape
+    assert np.isclose(energy, scoring.calc_energy(scoring.pair_table(coords, residues, chains), log_ratio))
+    assert np.abs(gradient - numeric_gradient(coords, residues, chains, log_ratio)).max() < 1e-6
+
+def test_energy_gradient_with_trained_table():
+    coords, residues, chains = load_4p5j()
+    log_ratio = scoring.read_report("log_ratio", os.path.join(root_dir, "reports"))
+
+    _, gradient = scoring.energy_gradient(coords, residues, chains, log_ratio)
+
+    assert np.abs(gradient - numeric_gradient(coords, residues, chains, log_ratio)).max() < 1e-6
+
+def test_energy_gradient_is_independent_of_the_blocks():
+    coords, residues, chains = load_4p5j()
+    log_ratio = synthetic_log_ratio()
+
+    energy, gradient = scoring.energy_gradient(coords, residues, chains, log_ratio)
+    blocked_energy, blocked_gradient = scoring.energy_gradient(coords, residues, chains, log_ratio, size=7, threads=3)
+
+    assert np.isclose(energy, blocked_energy)
+    assert np.allclose(gradient, blocked_gradient)
+
+def test_window_profiles():
+    energies = np.arange(10, dtype=float)
+    chains = ["A"] * 6 + ["B"] * 4
+
+    profiles = scoring.window_profiles(energies, chains, (1, 3))
+
+    assert np.array_equal(profiles[1], energies)
+    assert np.isnan(profiles[3][[0, 5, 6, 9]]).all()
+    assert np.allclose(profiles[3][[1, 4, 7, 8]], [3, 12, 21, 24])
+
+@pytest.mark.parametrize("windows", [(0,), (5, -3)])
+def test_window_profiles_rejects_empty_windows(windows):
+    with pytest.raises(ValueError):
+        scoring.window_profiles(np.zeros(10), ["A"] * 10, windows)
+
+def test_training_without_structure_keeps_the_reports(tmp_path):
+    assert scoring.training_run(["NOPE"], str(tmp_path), str(tmp_path), str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
+
+def two_chains_4p5j():
+    """Returns the 4P5J model split into two chains, with a few non standard residues"""
+    coords, residues, chains = load_4p5j()
+    residues = list(residues)
+    for idx in [3, 10, len(residues) - 2]:
+        residues[idx] = "PSU"
+
+    return coords, residues, ["A"] * (len(residues) // 2) + ["B"] * (len(residues) - len(residues) // 2)
+
+def test_shuffle_codes_keeps_the_chains_composition():
+    _, residues, chains = two_chains_4p5j()
+    codes = scoring.base_codes(residues)
+    chains = np.asarray(chains)
+
+    shuffled = scoring.shuffle_codes(residues, chains, 50, np.random.default_rng(0))
+
+    assert shuffled.shape == (50, len(residues))
+    assert np.all(shuffled[:, codes < 0] == -1)
+    assert np.any(shuffled != codes)
+    for chain in "AB":
+        for row in shuffled:
+            assert np.array_equal(np.sort(row[chains == chain]), np.sort(codes[chains == chain]))
+
+def test_zscore_matches_one_by_one_rescoring(monkeypatch):
+    coords, residues, chains = two_chains_4p5j()
+    log_ratio = synthetic_log_ratio()
+    table = scoring.pair_table(coords, residues, chains)
+
+    # Small blocks so the shuffled sequences are scored by several batches
+    monkeypatch.setattr(scoring, "max_block", 7 * len(table["bin"]))
+    result = scoring.calc_zscore(table, residues, chains, log_ratio, num_shuffle=20, seed=3)
+
+    # The shuffled sequences are drawn one by one from the same random stream, and each one is rescored from scratch
+    rng = np.random.default_rng(3)
+    energies = []
+    for _ in range(20):
+        codes = scoring.shuffle_codes(residues, chains, 1, rng)[0]
+        shuffled = [scoring.bases[code] if code >= 0 else residue for code, residue in zip(codes, residues)]
+        energies.append(scoring.calc_energy(scoring.pair_table(coords, shuffled, chains), log_ratio))
+
+    assert np.isclose(result["energy"], scoring.calc_energy(table, log_ratio))
+    assert np.isclose(result["mean"], np.mean(energies))
+    assert np.isclose(result["std"], np.std(energies))
+    assert np.isclose(result["zscore"], (result["energy"] - np.mean(energies)) / np.std(energies))
+
+def test_zscore_rejects_no_shuffle():
+    coords, residues, chains = load_4p5j()
+
+    with pytest.raises(ValueError):
+        scoring.calc_zscore(scoring.pair_table(coords, residues, chains), residues, chains, synthetic_log_ratio(), num_shuffle=0)
+
+def test_blocks_cover_the_pairs_triangle():
+    coords, residues, chains = load_4p5j()
+    counts = scoring.calc_histogram(scoring.pair_table(coords, residues, chains))
+
+    for size in [1, 5, 64, 4096]:
+        assert np.array_equal(scoring.blocked_histogram(coords, residues, chains, size=size, threads=2), counts)
+
+    with pytest.raises(ValueError):
+        scoring.get_blocks(len(residues), 0)
+
+def test_table_round_trip(tmp_path):
+    coords, residues, chains = load_4p5j()
+    table = scoring.pair_table(coords, residues, chains)
+
+    scoring.save_table(table, str(tmp_path / "table.npz"))
+    loaded = scoring.load_table(str(tmp_path / "table.npz"))
+
+    assert sorted(loaded) == sorted(table)
+    for key in ["idx_1", "idx_2", "code", "bin"]:
+        assert np.array_equal(loaded[key], table[key])
+    assert np.allclose(loaded["distance"], table["distance"], atol=1e-5)
+
+def test_cached_table_matches_the_uncached_one(tmp_path):
+    coords, residues, chains = load_4p5j()
+    log_ratio = synthetic_log_ratio()
+    table = scoring.blocked_table(coords, residues, chains)
+
+    # The first call computes and saves the table, the second one reads it
+    for _ in range(2):
+        cached = scoring.cached_table(coords, residues, chains, str(tmp_path))
+
+        assert len(list(tmp_path.iterdir())) == 1
+        for key in table:
+            assert np.array_equal(cached[key], table[key])
+        assert np.array_equal(scoring.calc_histogram(cached), scoring.blocked_histogram(coords, residues, chains))
+        assert scoring.calc_energy(cached, log_ratio) == scoring.calc_energy(table, log_ratio)
+
+def renumbered_4p5j(dir_path):
+    """Writes the 4P5J PDB file numbered from 101, the residue 110 getting an insertion code, and returns its residues numbers"""
+    lines = []
+    with open(os.path.join(root_dir, "PDB", "4P5J.pdb")) as pdb_file:
+        for line in pdb_file:
+            if line[:4] == "ATOM":
+                number = int(line[22:26]) + 100
+                line = f"{line[:22]}{number:>4}{'A' if number == 110 else ' '}{line[27:]}"
+            lines.append(line)
+
+    with open(os.path.join(dir_path, "RENUM.pdb"), "w") as pdb_file:
+        pdb_file.writelines(lines)
+
+    return [number for _, _, _, numbers in scoring.load_pdb("RENUM", dir_path, numbers=True) for number in numbers]
+
+def test_decomposition_files_keep_the_residues_numbers(tmp_path, capsys):
+    res_numbers = renumbered_4p5j(str(tmp_path))
+    assert res_numbers[0] == "101" and "110A" in res_numbers
+
+    # Only negative values, the highest residue energy is then negative
+    log_ratio = -np.abs(synthetic_log_ratio()) - 1
+    energies = scoring.decomposition_run("RENUM", (1, 5), str(tmp_path), "csv", str(tmp_path), str(tmp_path), log_ratio=log_ratio)[0]
+    assert f"the highest residue energy is {energies.max()}" in capsys.readouterr().out
+    assert energies.max() < 0
+
+    with open(tmp_path / "RENUMm1_A.csv") as csv_file:
+        rows = [line.strip().split(";") for line in csv_file]
+    assert rows[0] == ["position", "number", "residue", "energy", "window_1", "window_5"]
+    assert [row[1] for row in rows[1:]] == res_numbers
+    assert np.allclose([float(row[3]) for row in rows[1:]], energies)
+
+    scoring.decomposition_run("RENUM", (1, 5), str(tmp_path), "npz", str(tmp_path), str(tmp_path), log_ratio=log_ratio)
+    with np.load(tmp_path / "RENUMm1.npz") as npz_file:
+        assert npz_file["numbers"].tolist() == res_numbers
+        assert npz_file["chains"].tolist() == ["A"] * len(res_numbers)
+        assert npz_file["windows"].tolist() == [1, 5]
+        assert np.allclose(npz_file["profiles"][:, 0], energies)
+        assert np.allclose(npz_file["energies"], energies)
@@ -17,6 +17,8 @@ import math
 from settings import pdb_lines, pdb_cols, base_pairs, base_list, col_names, intervals
 from files_manager import *
 
+import scoring
+
 def get_num_model(seq_ref, dir_path="PDB"):
     """Returns the number of models for any given RNA PDB file
     
@@ -200,6 +202,26 @@ def calc_distances(seq_ref, dir_path="pdb_models", rpt_dir="reports"):
     print(distances_df)
     distances_df.to_csv(f"{rpt_dir}/tmp_dist.txt", sep=";", index=False) 
 
+def update_distances(counts, rpt_dir="reports"):
+    """Add already computed distances counts (e.g. from the cached pair tables) to the temp. distances report file
+
+    Parameters:
+    counts (np.ndarray): The 10 x 20 counts array, ordered as base_list
+    rpt_dir (str): The directory path where report will be saved, default is "reports"
+
+    Returns:
+    None: Update the temp. distances report file
+    """
+    distances_df = pd.read_csv(f"{rpt_dir}/tmp_dist.txt", sep=";")
+
+    # The first rows of base_pairs are the base_list ones, the reversed pairs are combined by final_distance anyway
+    for row_idx, pair in enumerate(base_list):
+        for col_idx, interval in enumerate(intervals):
+            distances_df.at[base_pairs.index(pair), interval] += counts[row_idx][col_idx]
+
+    print(distances_df)
+    distances_df.to_csv(f"{rpt_dir}/tmp_dist.txt", sep=";", index=False)
+
 def final_distance(rpt_dir="reports"):
     """Combine the similar base pairs (i.e. AU/UA, AG/GA..) within unique pair and generate the final distances report file
     
@@ -324,12 +346,13 @@ def calc_log_ratio(rpt_dir="reports"):
     except:
         print("Something wrong with the frequencies reports, please try to re-run the code from the begging!")
 
-def training_run(seq_ref, dir_path="pdb_models"):
+def training_run(seq_ref, dir_path="pdb_models", cache_dir=None):
     """The main training script, it trains the objective function, using interatomic distance distributions that are computed from a dataset of known 3D structures (i.e. experimentally determined)
     
     Parameters:
     seq_ref (str): The reference of the sequence to be checked
     dir_path (str): The directory path to store the models, default is "pdb_models"
+    cache_dir (str): The directory path where the pair tables are cached, default is None (no cache)
 
     Returns:
     None: Launch the training script to perform the requested computing
@@ -342,8 +365,12 @@ def training_run(seq_ref, dir_path="pdb_models"):
     print("Report files preparation...")
     report_prep()
 
+    # With a cache, the pair tables are shared with the evaluation script, so a structure already scored is not computed again
+    models = scoring.load_structure(seq_ref, mdl_dir=dir_path)
+    tables = [scoring.cached_table(coords, residues, chains, cache_dir) if cache_dir else scoring.blocked_table(coords, residues, chains) for coords, residues, chains in models]
+
     print("Distances calculation...")
-    calc_distances(seq_ref)
+    update_distances(sum(scoring.calc_histogram(table) for table in tables))
     final_distance()
 
     print("Observed frequency calculation...")